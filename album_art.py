@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+专辑封面模块，从系统媒体会话获取封面，在后台线程解码和缩放，结果缓存在内存和磁盘中
+
+Windows上通过系统媒体传输控制（SMTC）获取，依赖winsdk；
+Linux上读取MPRIS播放器提供的mpris:artUrl；两者都不可用时create_default_source返回None
+"""
+
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, QThread, Qt, pyqtSignal
+from PyQt5.QtGui import QImage
+
+from state_snapshot import default_snapshot_path
+
+try:
+    from winsdk.windows.media.control import (
+        GlobalSystemMediaTransportControlsSessionManager as MediaSessionManager
+    )
+    from winsdk.windows.storage.streams import Buffer, InputStreamOptions
+    has_winsdk = True
+except ImportError:
+    has_winsdk = False
+
+# 下载封面的超时时间（秒）和大小上限（字节）
+FETCH_TIMEOUT = 5.0
+MAX_ART_BYTES = 8 * 1024 * 1024
+# 刚切歌时媒体会话的封面可能还没有更新，取不到时隔一段时间重试（秒）
+FETCH_RETRY_DELAY = 1.0
+FETCH_RETRIES = 2
+
+# 来源确认当前播放的就是这首歌、但它没有封面时返回的值；
+# 返回None表示无法确认（会话还没切到这首歌或属于其他播放器），结果不能被缓存
+NO_ART = b""
+
+
+def default_cache_dir():
+    """
+    返回磁盘缓存目录，与状态快照放在同一个目录下
+    """
+    return os.path.join(os.path.dirname(default_snapshot_path()), "album_art")
+
+
+def track_key(song, artist):
+    """
+    按歌曲名和艺术家确定一首歌，作为缓存的键
+    """
+    return song or "", artist or ""
+
+
+class SmtcArtSource:
+    """
+    Windows系统媒体传输控制的封面来源，读取当前媒体会话的缩略图
+    """
+
+    def fetch(self, song, artist):
+        """
+        返回封面图片的原始数据；会话是这首歌但没有封面时返回NO_ART，无法确认时返回None
+        """
+        return asyncio.run(self._fetch(song))
+
+    async def _fetch(self, song):
+        manager = await MediaSessionManager.request_async()
+        session = manager.get_current_session()
+        if session is None:
+            return None
+        properties = await session.try_get_media_properties_async()
+        if properties is None:
+            return None
+        # 窗口标题解析出的歌曲名和会话中的标题可能略有不同，只要互相包含就认为是同一首
+        title = properties.title or ""
+        if not title or (song and song not in title and title not in song):
+            return None
+        if properties.thumbnail is None:
+            return NO_ART
+
+        stream = await properties.thumbnail.open_read_async()
+        size = min(stream.size, MAX_ART_BYTES)
+        buffer = Buffer(size)
+        await stream.read_async(buffer, size, InputStreamOptions.READ_AHEAD)
+        return bytes(buffer)
+
+
+class MprisArtSource:
+    """
+    MPRIS的封面来源，支持本地文件和http(s)地址
+    """
+
+    def __init__(self, music_source):
+        self.music_source = music_source
+
+    def fetch(self, song, artist):
+        current_song, _, art_url = self.music_source.get_current_art_url()
+        if current_song != song:
+            return None
+        if not art_url:
+            return NO_ART
+
+        parsed = urllib.parse.urlparse(art_url)
+        if parsed.scheme == "file":
+            with open(urllib.request.url2pathname(parsed.path), "rb") as f:
+                return f.read(MAX_ART_BYTES)
+        if parsed.scheme in ("http", "https"):
+            with urllib.request.urlopen(art_url, timeout=FETCH_TIMEOUT) as response:
+                return response.read(MAX_ART_BYTES)
+        return None
+
+
+class FakeArtSource:
+    """
+    模拟封面来源，用于测试和基准测试
+    """
+
+    def __init__(self):
+        self.images = {}  # (歌曲名, 艺术家) -> 图片数据
+        # 统计：被请求的次数
+        self.fetches = 0
+
+    def add(self, song, artist, data):
+        self.images[track_key(song, artist)] = data
+
+    def fetch(self, song, artist):
+        # 未添加的歌曲视为确认没有封面；添加时数据为None表示无法确认
+        self.fetches += 1
+        return self.images.get(track_key(song, artist), NO_ART)
+
+
+class ThumbnailLRU:
+    """
+    有容量上限的最近最少使用缓存，只在GUI线程中使用
+
+    值为None表示来源确认这首歌没有封面，同样缓存下来，避免重复请求
+    """
+
+    def __init__(self, capacity=32):
+        self.capacity = capacity
+        self.items = OrderedDict()
+        # 统计：命中和未命中次数
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def get(self, key):
+        if key not in self.items:
+            self.misses += 1
+            return None
+        self.items.move_to_end(key)
+        self.hits += 1
+        return self.items[key]
+
+    def put(self, key, value):
+        self.items[key] = value
+        self.items.move_to_end(key)
+        while len(self.items) > self.capacity:
+            self.items.popitem(last=False)
+
+    def clear(self):
+        self.items.clear()
+
+
+class DiskArtCache:
+    """
+    磁盘上的缩略图缓存，每首歌每种尺寸保存一个缩放好的PNG文件
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or default_cache_dir()
+
+    def path(self, key, size):
+        song, artist = key
+        digest = hashlib.sha1(f"{song}\0{artist}\0{size}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest + ".png")
+
+    def load(self, key, size):
+        try:
+            with open(self.path(key, size), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def save(self, key, size, data):
+        # 先写临时文件再替换，写入途中退出不会留下损坏的缓存
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix=".art-", suffix=".tmp", dir=self.directory)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, self.path(key, size))
+            except BaseException:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+                raise
+        except OSError as e:
+            print(f"保存专辑封面缓存失败: {e}")
+            return False
+        return True
+
+
+def scale_to_square(image, size):
+    """
+    把图片缩放并居中裁剪为size x size像素
+    """
+    scaled = image.scaled(size, size, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
+    x = (scaled.width() - size) // 2
+    y = (scaled.height() - size) // 2
+    return scaled.copy(x, y, size, size)
+
+
+def encode_png(image):
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "PNG")
+    buffer.close()
+    return bytes(data)
+
+
+class AlbumArtLoader(QThread):
+    """
+    专辑封面加载线程
+
+    获取、解码和缩放都在这个线程中进行，只产生QImage，由GUI线程转换为位图；
+    只保留最新的请求，快速切歌时中间的歌曲不会被加载；
+    来源暂时无法确认时会重试几次，有新的请求时立即放弃
+    """
+
+    # 信号：发送 ((歌曲名, 艺术家), 像素尺寸)、QImage（没有封面时为None）和结果是否确定；
+    # 不确定的结果（来源还没切到这首歌、加载出错）不应被缓存
+    art_ready = pyqtSignal(object, object, bool)
+
+    def __init__(self, source, disk_cache=None):
+        super().__init__()
+        self.source = source
+        self.disk_cache = disk_cache
+        self.running = True
+        self.condition = threading.Condition()
+        self.pending = None
+        # 统计：解码次数、磁盘缓存命中次数和请求来源的次数
+        self.decodes = 0
+        self.disk_hits = 0
+        self.fetches = 0
+
+    def request(self, song, artist, size):
+        """
+        在GUI线程中调用，请求加载一首歌的封面，覆盖还没有开始的请求
+        """
+        with self.condition:
+            self.pending = (track_key(song, artist), size)
+            self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.running and self.pending is None:
+                    self.condition.wait()
+                if not self.running:
+                    break
+                key, size = self.pending
+                self.pending = None
+
+            try:
+                image = self.load(key, size)
+            except Exception as e:
+                print(f"加载专辑封面失败: {e}")
+                image = None
+            with self.condition:
+                # 重试期间有了新的请求，放弃的结果不发送
+                if image is None and self.pending is not None:
+                    continue
+            if image is NO_ART:
+                self.art_ready.emit((key, size), None, True)
+            else:
+                self.art_ready.emit((key, size), image, image is not None)
+
+    def load(self, key, size):
+        """
+        先读磁盘缓存，没有时向来源请求原图，缩放后写入磁盘缓存
+        返回QImage；确认没有封面时返回NO_ART，无法确认时返回None
+        """
+        if self.disk_cache is not None:
+            data = self.disk_cache.load(key, size)
+            if data is not None:
+                image = QImage.fromData(data)
+                self.decodes += 1
+                if not image.isNull():
+                    self.disk_hits += 1
+                    return image
+
+        data = self.fetch(key)
+        if data is None:
+            return None
+        if not data:
+            return NO_ART
+        image = QImage.fromData(data)
+        self.decodes += 1
+        if image.isNull():
+            # 数据来自确认是这首歌的会话，只是无法解码，同样视为没有封面
+            return NO_ART
+
+        image = scale_to_square(image, size)
+        if self.disk_cache is not None:
+            self.disk_cache.save(key, size, encode_png(image))
+        return image
+
+    def fetch(self, key):
+        for attempt in range(FETCH_RETRIES + 1):
+            if attempt:
+                with self.condition:
+                    if self.running and self.pending is None:
+                        self.condition.wait(FETCH_RETRY_DELAY)
+                    if not self.running or self.pending is not None:
+                        return None
+            self.fetches += 1
+            data = self.source.fetch(*key)
+            if data is not None:
+                return data
+        return None
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+
+    def stats(self):
+        return {
+            "decodes": self.decodes,
+            "disk_hits": self.disk_hits,
+            "fetches": self.fetches
+        }
+
+
+def create_default_source(music_source=None):
+    """
+    按平台创建封面来源：Windows上使用SMTC，有MPRIS音乐来源时使用MPRIS，都不可用时返回None
+    """
+    if sys.platform == "win32" and has_winsdk:
+        return SmtcArtSource()
+    if music_source is not None and hasattr(music_source, "get_current_art_url"):
+        return MprisArtSource(music_source)
+    return None
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+背景缓存模块，缓存圆角背景的抗锯齿角块，绘制时只做贴图和矩形填充
+"""
+
+from PyQt5.QtCore import QRectF, Qt
+from PyQt5.QtGui import QColor, QPainter, QPixmap
+
+
+class RoundedBackgroundCache:
+    """
+    圆角背景缓存
+
+    四个圆角来自同一张预先抗锯齿绘制的圆形角块，其余部分是互不重叠的纯色矩形；
+    角块按半径、颜色和设备像素比缓存，窗口大小变化（包括动画的每一帧）都不需要重新绘制，
+    只有样式或缩放比例变化时才会重建
+    """
+
+    def __init__(self):
+        self.key = None
+        self.tile = None
+        self.color = QColor()
+        # 统计：角块重建次数和绘制次数
+        self.rebuilds = 0
+        self.paints = 0
+
+    def invalidate(self):
+        self.key = None
+        self.tile = None
+
+    def _corner_tile(self, radius, rgba, dpr):
+        key = (radius, rgba, dpr)
+        if key == self.key:
+            return self.tile
+
+        size = int(radius * 2 * dpr + 0.5)
+        tile = QPixmap(size, size)
+        tile.setDevicePixelRatio(dpr)
+        tile.fill(Qt.transparent)
+        self.color = QColor(*rgba)
+
+        painter = QPainter(tile)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(self.color)
+        painter.drawEllipse(QRectF(0, 0, radius * 2, radius * 2))
+        painter.end()
+
+        self.key = key
+        self.tile = tile
+        self.rebuilds += 1
+        return tile
+
+    def paint(self, painter, width, height, radius, rgba, dpr):
+        """
+        在(0, 0, width, height)区域绘制圆角背景，rgba为(r, g, b, a)元组
+        """
+        radius = min(radius, width // 2, height // 2)
+        if radius <= 0:
+            painter.fillRect(0, 0, width, height, QColor(*rgba))
+            return
+
+        tile = self._corner_tile(radius, rgba, dpr)
+        self.paints += 1
+
+        # 所有位置先换算成物理像素再取整，角块和矩形都落在像素边界上；
+        # 125%、150%等缩放下逻辑坐标乘以缩放比例不是整数，直接使用会让右侧和下方的角偏移半个像素
+        half = int(radius * dpr + 0.5)
+        right = max(round(width * dpr) - half, half)
+        bottom = max(round(height * dpr) - half, half)
+        size = half / dpr
+        x0, x1, x2 = 0.0, size, right / dpr
+        y0, y1, y2 = 0.0, size, bottom / dpr
+
+        # 角块按物理像素切成四份，分别贴到四个角
+        painter.drawPixmap(QRectF(x0, y0, size, size), tile, QRectF(0, 0, half, half))
+        painter.drawPixmap(QRectF(x2, y0, size, size), tile, QRectF(half, 0, half, half))
+        painter.drawPixmap(QRectF(x0, y2, size, size), tile, QRectF(0, half, half, half))
+        painter.drawPixmap(QRectF(x2, y2, size, size), tile, QRectF(half, half, half, half))
+
+        # 剩余部分用三个不重叠的矩形填充，避免半透明颜色叠加
+        if x2 > x1:
+            painter.fillRect(QRectF(x1, y0, x2 - x1, size), self.color)
+            painter.fillRect(QRectF(x1, y2, x2 - x1, size), self.color)
+        if y2 > y1:
+            painter.fillRect(QRectF(x0, y1, x2 + size, y2 - y1), self.color)
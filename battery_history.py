@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+电池历史模块，用固定大小的环形缓冲区记录电量采样并估算充放电速率
+"""
+
+from array import array
+
+
+class BatteryHistory:
+    """
+    电池采样环形缓冲区
+
+    每次采样只用最新和最旧两条记录计算窗口内的平均速率，再做指数平滑，
+    添加采样和查询估算都是O(1)；充电状态变化时清空重新统计
+    """
+
+    def __init__(self, capacity=60, smoothing=0.2, min_span=120.0, min_estimates=5):
+        self.capacity = capacity
+        # 平滑系数，越大越跟随最新的速率
+        self.smoothing = smoothing
+        # 窗口跨度小于该值（秒）时不给出速率，避免1%的跳变造成误判
+        self.min_span = min_span
+        # 至少得到这么多次速率估算后才判断速率是否稳定，第一次估算的抖动总是0
+        self.min_estimates = min_estimates
+        self.times = array("d", [0.0]) * capacity
+        self.percents = array("d", [0.0]) * capacity
+        self.count = 0
+        self.head = 0  # 下一次写入的位置
+        self.plugged = None
+        # 平滑后的速率（%/小时），正数为充电，负数为放电
+        self.rate = None
+        # 相邻两次速率变化量的平滑值，用于判断速率是否稳定
+        self.rate_jitter = None
+        self.estimates = 0
+
+    def clear(self):
+        self.count = 0
+        self.head = 0
+        self.rate = None
+        self.rate_jitter = None
+        self.estimates = 0
+
+    def _index(self, offset):
+        # offset为0表示最旧的一条
+        return (self.head - self.count + offset) % self.capacity
+
+    def add(self, timestamp, percent, plugged):
+        """
+        添加一条采样，时间戳为单调时钟秒数
+        """
+        if plugged != self.plugged:
+            self.clear()
+            self.plugged = plugged
+
+        self.times[self.head] = timestamp
+        self.percents[self.head] = percent
+        self.head = (self.head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+        oldest = self._index(0)
+        span = timestamp - self.times[oldest]
+        if span < self.min_span:
+            return
+
+        window_rate = (percent - self.percents[oldest]) / span * 3600.0
+        self.estimates += 1
+        if self.rate is None:
+            self.rate = window_rate
+            self.rate_jitter = 0.0
+        else:
+            previous = self.rate
+            self.rate += self.smoothing * (window_rate - self.rate)
+            change = abs(self.rate - previous)
+            self.rate_jitter += self.smoothing * (change - self.rate_jitter)
+
+    def latest_percent(self):
+        if self.count == 0:
+            return None
+        return self.percents[(self.head - 1) % self.capacity]
+
+    def time_to_empty(self):
+        """
+        按当前放电速率估算剩余使用时间（秒），无法估算时返回None
+        """
+        percent = self.latest_percent()
+        if percent is None or self.rate is None or self.rate >= -0.01:
+            return None
+        return percent / -self.rate * 3600.0
+
+    def time_to_full(self):
+        """
+        按当前充电速率估算充满所需时间（秒），无法估算时返回None
+        """
+        percent = self.latest_percent()
+        if percent is None or self.rate is None or self.rate <= 0.01:
+            return None
+        return (100.0 - percent) / self.rate * 3600.0
+
+    def is_stable(self, threshold=0.5):
+        """
+        得到足够多次速率估算、且速率变化的平滑值低于threshold（%/小时）时认为速率稳定
+        """
+        return (self.estimates >= self.min_estimates
+                and self.rate_jitter is not None and self.rate_jitter < threshold)
+
+    def suggested_interval(self, base_interval, max_interval=60.0):
+        """
+        速率稳定时放慢采样，否则使用基础间隔
+        """
+        if self.is_stable():
+            return min(base_interval * 4, max_interval)
+        return base_interval
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+背景绘制基准测试
+
+模拟一次展开/收起动画，逐帧比较每次都抗锯齿绘制圆角矩形和使用缓存角块两种方式的绘制耗时
+用法: python benchmarks/bench_background_paint.py [设备像素比]
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QBrush, QColor, QImage, QPainter
+from PyQt5.QtWidgets import QApplication
+
+from background_cache import RoundedBackgroundCache
+
+# 与DynamicIsland保持一致的尺寸
+COLLAPSED = (220, 40)
+EXPANDED = (320, 70)
+RADIUS = 20
+RGBA = (0, 0, 0, 200)
+# 400毫秒的动画按16毫秒一帧计算
+FRAMES = 25
+CYCLES = 20
+
+
+def animation_sizes():
+    # 展开再收起一次的逐帧尺寸
+    sizes = []
+    for start, end in ((COLLAPSED, EXPANDED), (EXPANDED, COLLAPSED)):
+        for frame in range(1, FRAMES + 1):
+            t = frame / FRAMES
+            eased = 1 - (1 - t) * (1 - t)
+            sizes.append((
+                round(start[0] + (end[0] - start[0]) * eased),
+                round(start[1] + (end[1] - start[1]) * eased)
+            ))
+    return sizes
+
+
+def paint_direct(painter, width, height, dpr):
+    # 旧方式：每帧新建画刷和颜色并抗锯齿绘制圆角矩形
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setBrush(QBrush(QColor(*RGBA)))
+    painter.setPen(Qt.NoPen)
+    painter.drawRoundedRect(0, 0, width, height, RADIUS, RADIUS)
+
+
+def run(label, paint, dpr):
+    samples = []
+    sizes = animation_sizes()
+    for _ in range(CYCLES):
+        for width, height in sizes:
+            image = QImage(int(width * dpr), int(height * dpr), QImage.Format_ARGB32_Premultiplied)
+            image.setDevicePixelRatio(dpr)
+            image.fill(Qt.transparent)
+            start = time.perf_counter()
+            painter = QPainter(image)
+            paint(painter, width, height, dpr)
+            painter.end()
+            samples.append(time.perf_counter() - start)
+
+    samples.sort()
+    avg = sum(samples) / len(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(f"{label}: 平均 {avg * 1e6:.1f} us/帧, p99 {p99 * 1e6:.1f} us/帧")
+
+
+def main():
+    app = QApplication(sys.argv)
+    dpr = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    print(f"设备像素比 {dpr}, 每次动画 {FRAMES * 2} 帧, 共 {CYCLES} 次")
+
+    run("直接绘制", paint_direct, dpr)
+
+    cache = RoundedBackgroundCache()
+
+    def paint_cached(painter, width, height, dpr):
+        cache.paint(painter, width, height, RADIUS, RGBA, dpr)
+
+    run("缓存角块", paint_cached, dpr)
+    print(f"角块重建 {cache.rebuilds} 次")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+窗口标题解析吞吐量基准测试
+
+用法: python benchmarks/bench_title_parse.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import music_utils
+from title_parser import TitleParser
+
+# 各播放器实际出现过的窗口标题
+TITLE_CORPUS = [
+    ("QQ音乐", "晴天 - 周杰伦"),
+    ("QQ音乐", "孤勇者 - 陈奕迅"),
+    ("QQ音乐", "Shape of You - Ed Sheeran"),
+    ("QQ音乐", "QQ音乐 听我想听"),
+    ("QQ音乐", "QQ音乐"),
+    ("网易云音乐", "起风了 - 买辣椒也用券"),
+    ("网易云音乐", "Mojito - 周杰伦"),
+    ("网易云音乐", "后来 (Live) - 刘若英"),
+    ("网易云音乐", "网易云音乐"),
+    ("酷我音乐", "青花瓷-周杰伦-酷我音乐"),
+    ("酷我音乐", "光年之外-G.E.M.邓紫棋-酷我音乐"),
+    ("酷我音乐", "酷我音乐"),
+    ("汽水音乐", "若月亮没来 - 王宇宙Leto/乔浚丞"),
+    ("汽水音乐", "汽水音乐"),
+    ("Spotify", "Daft Punk - Get Lucky - Radio Edit"),
+    ("Spotify", "The Weeknd - Blinding Lights"),
+    ("Spotify", "Queen - Bohemian Rhapsody - Remastered 2011"),
+    ("Spotify", "Spotify Premium"),
+    ("Spotify", "Spotify Free"),
+    ("Windows Media Player", "Kalimba - Mr. Scruff - Windows Media Player"),
+    ("Windows Media Player", "Windows Media Player"),
+]
+
+
+def bench(label, func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for player_name, title in TITLE_CORPUS:
+            func(player_name, title)
+    elapsed = time.perf_counter() - start
+    count = iterations * len(TITLE_CORPUS)
+    print(f"{label}: {count / elapsed:,.0f} 次/秒 ({elapsed * 1e9 / count:.0f} ns/次)")
+
+
+def main():
+    iterations = 20000
+
+    # 不带缓存：每次都执行完整的正则解析
+    parser = TitleParser(music_utils.SUPPORTED_PLAYERS)
+    bench("无缓存解析", parser._parse, iterations)
+
+    # 带缓存：标题不变时直接命中缓存
+    parser.cache_clear()
+    bench("缓存解析", parser.parse, iterations)
+    print(f"缓存统计: {parser.cache_info()}")
+
+    # 打印解析结果，便于人工核对规则
+    for player_name, title in TITLE_CORPUS:
+        print(f"  [{player_name}] {title!r} -> {parser.parse(player_name, title)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+音量快捷键的GUI线程耗时基准测试
+
+对比同步调节音量和交给音量命令线程两种方式下，每次按键占用GUI线程的时间
+用法: python benchmarks/bench_volume_keypress.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+# 状态快照写到临时目录，不覆盖本机用户的数据
+os.environ["XDG_CACHE_HOME"] = os.environ["LOCALAPPDATA"] = tempfile.mkdtemp(prefix="island-bench-")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication
+
+import volume_utils
+from dynamic_island import DynamicIsland, read_volume_info
+
+KEYPRESSES = 200
+
+
+def report(label, samples):
+    samples = sorted(samples)
+    avg = sum(samples) / len(samples)
+    p99 = samples[int(len(samples) * 0.99) - 1]
+    print(f"{label}: 平均 {avg * 1e6:.1f} us/次, p99 {p99 * 1e6:.1f} us/次")
+
+
+def main():
+    app = QApplication(sys.argv)
+    volume_utils.use_backend(volume_utils.FakeVolumeBackend(volume=0.0))
+    island = DynamicIsland()
+    island.show()
+
+    # 旧方式：在GUI线程中调节音量并立即刷新显示
+    samples = []
+    for _ in range(KEYPRESSES):
+        start = time.perf_counter()
+        volume_utils.increase_volume(step=0.05)
+        island.update_volume_info(read_volume_info())
+        samples.append(time.perf_counter() - start)
+    report("同步调节", samples)
+
+    # 新方式：只把命令放入队列，由音量命令线程合并执行
+    volume_utils.set_volume(0.0)
+    samples = []
+    for _ in range(KEYPRESSES):
+        start = time.perf_counter()
+        island.volume_up()
+        samples.append(time.perf_counter() - start)
+    report("命令队列", samples)
+
+    # 等待队列执行完毕
+    deadline = time.monotonic() + 2.0
+    while island.volume_worker.pending_delta and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+    print(f"最终音量: {volume_utils.get_volume_percentage()}%")
+
+    island.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+无界面基准测试套件
+
+在Qt的offscreen平台上使用模拟的窗口和音量后端运行，不需要win32和pycaw，
+可以在Linux CI上执行。结果与baselines.json中的基准值比较，
+任何指标超出基准值的容差范围、缺少基准值或没有基准值文件时以非零状态退出
+
+用法:
+    python benchmarks/run_benchmarks.py                    # 运行并与基准值比较
+    python benchmarks/run_benchmarks.py --update-baselines # 运行并把结果保存为新的基准值
+    python benchmarks/run_benchmarks.py --tolerance 0.5    # 允许比基准值慢50%
+    python benchmarks/run_benchmarks.py --repeat 5         # 每项运行5次，取最好的结果
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from PyQt5.QtCore import QEvent, QObject, Qt
+from PyQt5.QtGui import QImage
+from PyQt5.QtWidgets import QApplication
+
+import album_art
+import music_utils
+import volume_utils
+from bench_title_parse import TITLE_CORPUS
+from title_parser import TitleParser
+
+BASELINE_FILE = os.path.join(BENCH_DIR, "baselines.json")
+# 默认容差：比基准值慢30%以内视为正常波动
+DEFAULT_TOLERANCE = 0.3
+# 默认每项基准测试运行的次数，取每个指标的最小值以减少机器负载带来的波动
+DEFAULT_REPEAT = 3
+
+MUSIC_TICKS = 2000
+TITLE_ITERATIONS = 2000
+VOLUME_UPDATES = 500
+HOVER_CYCLES = 1000
+# 每次悬停进入和离开后推进的动画帧数
+HOVER_FRAMES = 3
+ART_SONGS = 8
+ART_CYCLES = 50
+
+
+def make_window_backend():
+    # 模拟一个普通桌面：大量无关窗口，加上三个后台播放器
+    backend = music_utils.FakeWindowBackend()
+    for i in range(150):
+        backend.add_window(0x1000 + i, 1000 + i // 3, f"app{i // 3}.exe", f"Class{i}", f"文档 {i}")
+    backend.add_window(0x9001, 9001, "cloudmusic.exe", "OrpheusBrowserHost", "起风了 - 买辣椒也用券")
+    backend.add_window(0x9002, 9002, "Spotify.exe", "Chrome_WidgetWin_0", "Daft Punk - Get Lucky")
+    backend.add_window(0x9003, 9003, "QQMusic.exe", "OrpheusBrowserHost", "QQ音乐 听我想听")
+    # 前台是普通窗口，每次轮询都要枚举所有窗口
+    backend.set_foreground(0x1000)
+    return backend
+
+
+def wait_until(app, predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise RuntimeError("等待超时")
+        app.processEvents()
+
+
+def bench_music_poll(app):
+    # 音乐探针每次轮询的耗时，每10次切换一次歌曲标题
+    from dynamic_island import read_music_info
+
+    backend = make_window_backend()
+    music_utils.use_window_backend(backend)
+    titles = ["起风了 - 买辣椒也用券", "Mojito - 周杰伦", "后来 (Live) - 刘若英"]
+
+    start = time.perf_counter()
+    for tick in range(MUSIC_TICKS):
+        if tick % 10 == 0:
+            backend.set_title(0x9001, titles[tick // 10 % len(titles)])
+        read_music_info()
+    elapsed = time.perf_counter() - start
+    return {"music_poll_tick_us": elapsed / MUSIC_TICKS * 1e6}
+
+
+def bench_title_parse(app):
+    # 标题解析吞吐量，分别统计完整解析和缓存命中
+    parser = TitleParser(music_utils.SUPPORTED_PLAYERS)
+    count = TITLE_ITERATIONS * len(TITLE_CORPUS)
+    results = {}
+    for name, func in (("title_parse_uncached_ns", parser._parse), ("title_parse_cached_ns", parser.parse)):
+        start = time.perf_counter()
+        for _ in range(TITLE_ITERATIONS):
+            for player_name, title in TITLE_CORPUS:
+                func(player_name, title)
+        results[name] = (time.perf_counter() - start) / count * 1e9
+    return results
+
+
+def bench_first_frame(app):
+    # 从创建窗口到第一次绘制完成的时间
+    from dynamic_island import DynamicIsland
+
+    start = time.perf_counter()
+    island = DynamicIsland()
+    constructed = time.perf_counter()
+    island.show()
+    wait_until(app, lambda: "paint" in island.frame_stats.histograms)
+    painted = time.perf_counter()
+    island.close()
+    return {
+        "construct_ms": (constructed - start) * 1000,
+        "time_to_first_frame_ms": (painted - start) * 1000
+    }
+
+
+def bench_volume_update(app):
+    # 系统音量变化推送到音量标签显示新值的延迟
+    from dynamic_island import DynamicIsland
+
+    backend = volume_utils.FakeVolumeBackend(volume=0.0)
+    volume_utils.use_backend(backend)
+    island = DynamicIsland()
+    island.show()
+    app.processEvents()
+
+    samples = []
+    for i in range(VOLUME_UPDATES):
+        volume = (i % 100 + 1) / 100.0
+        # 与界面使用相同的四舍五入，浮点音量不会因为截断而对不上
+        expected = f"{round(volume * 100)}%"
+        start = time.perf_counter()
+        backend.simulate_change(volume=volume)
+        wait_until(app, lambda: island.volume_percent_label.text() == expected)
+        samples.append(time.perf_counter() - start)
+
+    island.close()
+    samples.sort()
+    return {
+        "volume_update_avg_us": sum(samples) / len(samples) * 1e6,
+        "volume_update_p99_us": samples[int(len(samples) * 0.99) - 1] * 1e6
+    }
+
+
+def bench_hover_churn(app):
+    # 1000次悬停进入/离开的耗时，以及窗口子对象数量的增长（动画对象泄漏）
+    from dynamic_island import DynamicIsland
+
+    island = DynamicIsland()
+    island.show()
+    app.processEvents()
+    animator = island.geometry_animator
+    enter = QEvent(QEvent.Enter)
+    leave = QEvent(QEvent.Leave)
+    children_before = len(island.findChildren(QObject))
+
+    start = time.perf_counter()
+    for _ in range(HOVER_CYCLES):
+        island.enterEvent(enter)
+        for _ in range(HOVER_FRAMES):
+            animator.tick()
+        island.leaveEvent(leave)
+        for _ in range(HOVER_FRAMES):
+            animator.tick()
+    elapsed = time.perf_counter() - start
+    app.processEvents()
+    children_after = len(island.findChildren(QObject))
+
+    island.close()
+    return {
+        "hover_cycle_us": elapsed / HOVER_CYCLES * 1e6,
+        "hover_child_growth": children_after - children_before
+    }
+
+
+def bench_album_art(app):
+    # 首次加载后重复播放和展开收起的耗时，以及其间的封面解码次数（应为0）
+    from dynamic_island import DynamicIsland
+
+    source = album_art.FakeArtSource()
+    cover = QImage(600, 600, QImage.Format_RGB32)
+    cover.fill(Qt.darkCyan)
+    data = album_art.encode_png(cover)
+    songs = [(f"歌曲{i}", "艺术家") for i in range(ART_SONGS)]
+    for song, artist in songs:
+        source.add(song, artist, data)
+
+    # 每次运行使用新的目录，第一轮总是从空的磁盘缓存开始
+    snapshot_path = os.path.join(tempfile.mkdtemp(prefix="island-art-"), "state.json")
+    island = DynamicIsland(art_source=source, snapshot_path=snapshot_path)
+    island.show()
+    app.processEvents()
+    loader = island.album_art_loader
+
+    # 第一轮每首歌都要获取和解码
+    for song, artist in songs:
+        island.update_music_info(song, artist)
+        wait_until(app, lambda: island.album_art_key in island.album_art_cache)
+    decodes = loader.decodes
+
+    start = time.perf_counter()
+    for _ in range(ART_CYCLES):
+        for song, artist in songs:
+            island.update_music_info(song, artist)
+            island.toggle_expand()
+            island.toggle_expand()
+    elapsed = time.perf_counter() - start
+    app.processEvents()
+    island.close()
+
+    return {
+        "album_art_repeat_us": elapsed / (ART_CYCLES * ART_SONGS) * 1e6,
+        "album_art_repeat_decodes": loader.decodes - decodes
+    }
+
+
+BENCHMARKS = [
+    bench_music_poll,
+    bench_title_parse,
+    bench_first_frame,
+    bench_volume_update,
+    bench_hover_churn,
+    bench_album_art,
+]
+
+
+def load_baselines():
+    if not os.path.exists(BASELINE_FILE):
+        return {}
+    with open(BASELINE_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baselines(results):
+    with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(results, baselines, tolerance):
+    """
+    所有指标都是越小越好，返回超出容差或没有基准值的指标列表
+    """
+    regressions = []
+    for name, value in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            print(f"  {name:<28} {value:>12.2f}   无基准值")
+            regressions.append(name)
+            continue
+        limit = baseline * (1 + tolerance)
+        failed = value > limit
+        status = "回退" if failed else "正常"
+        print(f"  {name:<28} {value:>12.2f}   基准 {baseline:>10.2f}   {status}")
+        if failed:
+            regressions.append(name)
+    return regressions
+
+
+def isolate_cache_dirs():
+    cache_home = tempfile.mkdtemp(prefix="island-bench-")
+    os.environ["XDG_CACHE_HOME"] = os.environ["LOCALAPPDATA"] = cache_home
+
+
+def main():
+    parser = argparse.ArgumentParser(description="动态岛无界面基准测试套件")
+    parser.add_argument("--update-baselines", action="store_true", help="把本次结果保存为基准值")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="允许超出基准值的比例")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="每项基准测试运行的次数")
+    args = parser.parse_args()
+
+    # 状态快照和封面缓存都写到临时目录，不覆盖本机用户的数据
+    isolate_cache_dirs()
+    app = QApplication(sys.argv)
+
+    results = {}
+    for benchmark in BENCHMARKS:
+        for _ in range(max(args.repeat, 1)):
+            for name, value in benchmark(app).items():
+                results[name] = min(results.get(name, value), value)
+
+    if args.update_baselines:
+        save_baselines(results)
+        for name, value in sorted(results.items()):
+            print(f"  {name:<28} {value:>12.2f}")
+        print(f"基准值已保存到 {BASELINE_FILE}")
+        return 0
+
+    baselines = load_baselines()
+    if not baselines:
+        print(f"没有找到基准值文件 {BASELINE_FILE}，请先使用 --update-baselines 生成")
+        return 1
+
+    regressions = compare(results, baselines, args.tolerance)
+    if regressions:
+        print(f"性能回退或缺少基准值: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
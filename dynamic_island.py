@@ -1,14 +1,28 @@
 # 浩讯亿通电脑店
 
+import os
 import sys
+import threading
+import time
+from datetime import datetime
+
+# 启动跟踪，以开始导入依赖的时刻为起点
+from startup_trace import StartupTrace
+STARTUP_TRACE = StartupTrace()
+
 import psutil
+try:
+    STARTUP_TRACE.align_to_process_start(psutil.Process().create_time())
+except Exception:
+    pass
 from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QHBoxLayout, QShortcut
-from PyQt5.QtCore import Qt, QTimer, QPoint, QPropertyAnimation, QEasingCurve, QThread, pyqtSignal
-from PyQt5.QtGui import QFont, QColor, QPalette, QPainter, QBrush, QPen, QRegion, QKeySequence
+from PyQt5.QtCore import Qt, QTimer, QPoint, QRect, QThread, pyqtSignal
+from PyQt5.QtGui import QFont, QColor, QPalette, QPainter, QPen, QPixmap, QRegion, QKeySequence
 
 # 尝试导入音乐工具模块
 try:
     import music_utils
+    from player_state import PlayerStateStore
     has_music_utils = True
 except ImportError:
     has_music_utils = False
@@ -22,96 +36,256 @@ except ImportError:
     has_volume_utils = False
     print("未找到volume_utils模块，音量控制功能不可用")
 
-# 音乐播放器线程类，用于后台获取音乐信息
-class MusicPlayerThread(QThread):
-    music_updated = pyqtSignal(str, str)  # 信号：发送歌曲名和艺术家
+import window_events
+import mpris_music
+import album_art
+from sensor_hub import SensorHub
+from view_model import LabelViewModel
+from power_profile import SamplingPolicy
+from battery_history import BatteryHistory
+from geometry_animator import GeometryAnimator
+from background_cache import RoundedBackgroundCache
+from glyph_atlas import GlyphAtlas
+from frame_stats import FrameStats
+from state_snapshot import StateSnapshot
+
+STARTUP_TRACE.mark("import")
+
+# 时间只显示到分钟，时钟探针在每个整分钟（包括跨天）时执行（秒）
+CLOCK_BOUNDARY = 60.0
+
+# 各探针的采样间隔（秒），None表示只在推送或唤醒时更新
+SENSOR_INTERVALS = {
+    # 仅在无法注册音量推送时使用；本程序调节的音量会立即显示，轮询只用于发现外部修改
+    "volume": 5.0,
+    "battery": 5.0,
+    "music": 0.5,  # 无法订阅窗口事件时的轮询间隔
+    "music_event_driven": 5.0,  # 有窗口事件时的兜底轮询间隔
+    "power": 15.0,  # 重新评估采样档位的间隔，不受档位影响
+}
+
+# 收到窗口事件后等待一小段时间，合并连续触发的事件（秒）
+MUSIC_EVENT_DEBOUNCE = 0.05
+# 窗口事件唤醒音乐探针的最小间隔（秒），播放器标题频繁变化时也不会比它更密
+MUSIC_EVENT_MIN_SPACING = 0.5
+
+# 窗口标题变化后需要保持不变的时间（秒），过滤焦点切换和短暂的标题
+MUSIC_STABLE_WINDOW = 1.0
+
+WEEK_DAYS = ('周一', '周二', '周三', '周四', '周五', '周六', '周日')
+
+# Windows消息：休眠唤醒和系统时间变化
+WM_TIMECHANGE = 0x001E
+WM_POWERBROADCAST = 0x0218
+PBT_APMRESUMESUSPEND = 0x0007
+PBT_APMRESUMEAUTOMATIC = 0x0012
+
+# 铃铛摇摆动画：最大角度（度）、摆到最大角度的帧数和帧间隔（毫秒）
+BELL_MAX_ANGLE = 15.0
+BELL_SWING_STEPS = 10
+BELL_FRAME_INTERVAL = 50
+
+def bell_swing_angles(max_angle=BELL_MAX_ANGLE, steps=BELL_SWING_STEPS):
+    # 先摆到右侧最大角度，再摆到左侧最大角度，最后回到中间
+    step = max_angle / steps
+    right = [step * i for i in range(1, steps + 1)]
+    left = [max_angle - step * i for i in range(1, steps * 2 + 1)]
+    back = [-max_angle + step * i for i in range(1, steps + 1)]
+    return tuple(round(angle, 3) for angle in right + left + back)
+
+BELL_SWING_ANGLES = bell_swing_angles()
+
+# 设置该环境变量后启动即进入调试模式，显示性能浮层并在退出时保存统计数据
+DEBUG_ENV = "DYNAMIC_ISLAND_DEBUG"
+FRAME_STATS_FILE = "frame_stats.json"
+# 调试浮层的刷新间隔（毫秒）
+DEBUG_OVERLAY_INTERVAL = 500
+
+# 状态变化后等待一段时间再写入快照，合并连续的变化（毫秒）
+SNAPSHOT_DEBOUNCE = 2000
+# 这些探针都收到实时数据后，显示内容才算准确
+LIVE_FIELDS = ("music", "volume", "battery")
+
+# 专辑封面的显示尺寸（逻辑像素）和内存中缓存的封面数量
+ALBUM_ART_SIZE = 32
+ALBUM_ART_CACHE_SIZE = 32
+# 来源无法确认当前歌曲时（媒体会话落后于窗口标题或属于其他播放器），隔一段时间重新请求（毫秒），
+# 每首歌最多重新请求的次数
+ALBUM_ART_RETRY_INTERVAL = 5000
+ALBUM_ART_MAX_RETRIES = 3
+
+def read_time_info():
+    # 时间探针，返回 (时间标签文本, 日历详情文本)
+    current_datetime = datetime.now()
+    current_time = current_datetime.strftime('%H:%M')
+    current_date = current_datetime.strftime('%m-%d')
+    
+    week_day = WEEK_DAYS[current_datetime.weekday()]
+    full_date = current_datetime.strftime('%Y年%m月%d日')
+    return f"{current_date} {current_time}", f"{full_date} {week_day}"
+
+def read_volume_info():
+    # 音量探针，返回 (音量百分比, 是否静音)，音量功能不可用时返回None
+    if has_volume_utils and volume_utils.volume_initialized:
+        return volume_utils.get_volume_percentage(), volume_utils.get_mute()
+    return None
+
+def read_battery_info():
+    # 电池探针，返回 (电量百分比, 是否在充电)，无法获取时返回None
+    # 电量保留小数，整数的1%跳变会让几分钟窗口内的速率大多算成0
+    battery = psutil.sensors_battery()
+    if battery:
+        return battery.percent, battery.power_plugged
+    return None
+
+def format_battery_estimate(history):
+    # 根据电池历史生成剩余时间说明，无法估算时返回空字符串
+    seconds = history.time_to_empty()
+    label = "预计可用"
+    if seconds is None:
+        seconds = history.time_to_full()
+        label = "预计充满还需"
+    if seconds is None:
+        return ""
+    
+    minutes = int(seconds // 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{label} {hours}小时{minutes}分钟"
+    return f"{label} {minutes}分钟"
+
+# 按播放器跟踪窗口标题，固定窗口句柄并对标题变化做去抖
+player_states = PlayerStateStore(MUSIC_STABLE_WINDOW) if has_music_utils else None
+
+def read_music_info():
+    # 音乐探针，返回 (歌曲名, 艺术家)
+    if not has_music_utils:
+        # 使用模拟数据
+        return "示例音乐", "示例艺术家"
+    
+    try:
+        if music_utils.has_music_source():
+            # 推送式的音乐来源已经去重，直接读取
+            song, artist = music_utils.get_current_playing_music()
+        else:
+            # 前台播放器优先，否则使用最近切歌的播放器，标题稳定后才会变化
+            song, artist = player_states.poll()
+        
+        if song and artist:
+            # 确保信息不为空
+            return song or "未知歌曲", artist or "未知艺术家"
+        
+        # 没有音乐播放时的处理
+        return "无音乐播放", ""
+    except Exception:
+        # 如果出错，使用模拟数据
+        return "示例音乐", "示例艺术家"
+
+# 音量命令线程类，合并连续的音量调节并在后台执行
+class VolumeCommandThread(QThread):
+    volume_applied = pyqtSignal(float, bool)  # 信号：发送调节后的音量(0.0-1.0)和静音状态
     
     def __init__(self):
         super().__init__()
         self.running = True
-        self.current_song = None
-        self.current_artist = None
-        
+        self.condition = threading.Condition()
+        # 等待执行的音量净变化量和静音切换次数
+        self.pending_delta = 0.0
+        self.pending_mute_toggles = 0
+    
+    def change_volume(self, delta):
+        # 在GUI线程中调用，只记录变化量
+        with self.condition:
+            self.pending_delta += delta
+            self.condition.notify()
+    
+    def toggle_mute(self):
+        # 在GUI线程中调用，只记录切换次数
+        with self.condition:
+            self.pending_mute_toggles += 1
+            self.condition.notify()
+    
     def run(self):
-        while self.running:
-            if has_music_utils:
-                try:
-                    # 尝试从所有支持的播放器获取音乐信息
-                    song = None
-                    artist = None
-                    
-                    # 1. 尝试获取当前活动窗口的音乐信息
-                    song, artist = music_utils.get_current_playing_music()
-                    
-                    # 2. 如果当前没有获取到，尝试检查所有运行的播放器
-                    if not song:
-                        running_players = music_utils.get_all_running_players()
-                        for player_name in running_players:
-                            player_song, player_artist = music_utils.get_music_from_specific_player(player_name)
-                            if player_song:
-                                song = player_song
-                                artist = player_artist
-                                break
-                    
-                    if song and artist:
-                        # 确保信息不为空
-                        song = song or "未知歌曲"
-                        artist = artist or "未知艺术家"
-                        
-                        # 如果信息发生变化，发送信号
-                        if (song != self.current_song or artist != self.current_artist):
-                            self.current_song = song
-                            self.current_artist = artist
-                            self.music_updated.emit(song, artist)
-                    else:
-                        # 没有音乐播放时的处理
-                        song = "无音乐播放"
-                        artist = ""
-                        if (song != self.current_song or artist != self.current_artist):
-                            self.current_song = song
-                            self.current_artist = artist
-                            self.music_updated.emit(song, artist)
-                except Exception:
-                    # 如果出错，使用模拟数据
-                    song = "示例音乐"
-                    artist = "示例艺术家"
-                    if song != self.current_song or artist != self.current_artist:
-                        self.current_song = song
-                        self.current_artist = artist
-                        self.music_updated.emit(song, artist)
-            else:
-                # 使用模拟数据
-                song = "示例音乐"
-                artist = "示例艺术家"
-                if song != self.current_song or artist != self.current_artist:
-                    self.current_song = song
-                    self.current_artist = artist
-                    self.music_updated.emit(song, artist)
-            
-            # 每500毫秒检查一次
-            self.msleep(500)
+        while True:
+            with self.condition:
+                while self.running and not self.pending_delta and not self.pending_mute_toggles:
+                    self.condition.wait()
+                if not self.running:
+                    break
+                
+                # 取出积累的所有命令，执行期间的新命令会在下一轮合并
+                delta = self.pending_delta
+                mute_toggles = self.pending_mute_toggles
+                self.pending_delta = 0.0
+                self.pending_mute_toggles = 0
+            
+            if not has_volume_utils:
+                continue
+            try:
+                if abs(delta) > 1e-6:
+                    volume_utils.change_volume(delta)
+                # 连续切换偶数次等于没有切换
+                if mute_toggles % 2:
+                    volume_utils.toggle_mute()
+                self.volume_applied.emit(volume_utils.current_volume, volume_utils.mute_state)
+            except Exception as e:
+                print(f"执行音量命令失败: {e}")
     
     def stop(self):
-        self.running = False
+        with self.condition:
+            self.running = False
+            self.condition.notify()
 
 class DynamicIsland(QWidget):
-    def __init__(self):
+    volume_backend_ready = pyqtSignal()  # 信号：音量后端在后台初始化完成
+    
+    def __init__(self, event_source=None, art_source=None, snapshot_path=None):
         super().__init__()
         self.draggable = False
         self.drag_position = QPoint()
         self.click_pos = QPoint()  # 记录点击位置，用于区分点击和拖拽
         self.expanded = False  # 展开状态标志
         
-        # 初始化音乐信息
-        self.current_song = "示例音乐"
-        self.current_artist = "示例艺术家"
+        # 读取上次退出前的状态快照，首帧直接显示上次的歌曲、音量和电池
+        self.state_snapshot = StateSnapshot(snapshot_path)
+        self.snapshot = self.state_snapshot.load()
+        self.snapshot_timer = QTimer(self)
+        self.snapshot_timer.setSingleShot(True)
+        self.snapshot_timer.timeout.connect(self.state_snapshot.save)
+        # 已经收到实时数据的探针
+        self.live_fields = set()
+        
+        # 初始化音乐信息，有快照时使用上次的歌曲
+        if self.snapshot.get("song"):
+            self.current_song = self.snapshot["song"]
+            self.current_artist = self.snapshot.get("artist") or ""
+        else:
+            self.current_song = "示例音乐"
+            self.current_artist = "示例艺术家"
+        
+        # 初始化音量命令线程，音量调节不在GUI线程中执行
+        self.volume_worker = VolumeCommandThread()
+        self.volume_worker.volume_applied.connect(self.on_volume_changed)
+        self.volume_worker.start()
+        
+        # 电池采样历史，用于估算剩余使用时间
+        self.battery_history = BatteryHistory()
+        
+        # 绘制、动画帧间隔和更新回调的耗时统计
+        self.frame_stats = FrameStats()
+        self.debug_mode = bool(os.environ.get(DEBUG_ENV))
+        self.debug_overlay = None
+        QApplication.instance().aboutToQuit.connect(self.on_about_to_quit)
         
-        # 初始化音乐播放器线程
-        self.music_thread = MusicPlayerThread()
-        self.music_thread.music_updated.connect(self.update_music_info)
-        self.music_thread.start()
+        # 音量后端在窗口显示后才在后台初始化，首帧不等待COM和音频设备枚举
+        self.backend_init_started = False
+        self.first_frame_painted = False
+        self.volume_backend_ready.connect(self.on_volume_backend_ready)
         
         self.initUI()
+        self.init_sensor_hub(event_source)
+        self.init_album_art(art_source)
+        STARTUP_TRACE.mark("ui")
         
     def initUI(self):
         # 设置窗口大小
@@ -126,7 +300,14 @@ class DynamicIsland(QWidget):
         screen_geometry = screen.availableGeometry()
         x = (screen_geometry.width() - self.original_width) // 2
         y = 10  # 距离顶部10像素
+        
+        # 恢复上次拖动到的位置，该位置已经不在任何屏幕上时仍然居中
+        window_pos = self.snapshot.get("window")
+        if window_pos and QApplication.screenAt(QPoint(*window_pos)) is not None:
+            x, y = window_pos
         self.setGeometry(x, y, self.original_width, self.original_height)
+        # 悬停和展开时以这一点（顶边中点）为锚点改变大小
+        self.anchor = QPoint(x + self.original_width // 2, y)
         
         # 设置窗口样式
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool | Qt.Window)
@@ -140,19 +321,30 @@ class DynamicIsland(QWidget):
         palette.setColor(QPalette.Window, QColor(0, 0, 0, 200))  # 半透明黑色
         self.setPalette(palette)
         
-        # 初始化动画存储变量
-        self.active_animations = []
+        # 背景样式和缓存，样式或缩放比例变化时缓存自动重建
+        self.background_radius = 20
+        self.background_alpha = 200
+        self.background_cache = RoundedBackgroundCache()
+        
+        # 标签视图模型，跳过内容没有变化的更新
+        self.view_model = LabelViewModel(self)
+        
+        # 悬停和展开共用一个几何动画器，途中可以直接改变目标
+        self.geometry_animator = GeometryAnimator(self, self.frame_stats)
         
         # 创建布局
         layout = QHBoxLayout(self)
         layout.setContentsMargins(15, 8, 15, 8)
         layout.setSpacing(15)
         
+        # 图标预先栅格化为位图，切换图标时不再排版文本
+        self.glyph_atlas = GlyphAtlas(QFont('Arial', 14))
+        self.icon_glyphs = {}  # 标签 -> (图标, 旋转角度)
+        self.screen_change_connected = False
+        
         # 创建状态图标标签
         self.volume_label = QLabel(self)
-        self.volume_label.setText("🔊")
-        self.volume_label.setFont(QFont('Arial', 14))
-        self.volume_label.setStyleSheet("color: white;")
+        self.set_icon(self.volume_label, "🔊")
         self.volume_label.setToolTip("点击调节音量")
         
         # 音量控制相关
@@ -165,16 +357,18 @@ class DynamicIsland(QWidget):
         
         
         self.battery_label = QLabel(self)
-        self.battery_label.setText("🔋")
-        self.battery_label.setFont(QFont('Arial', 14))
-        self.battery_label.setStyleSheet("color: white;")
+        self.set_icon(self.battery_label, "🔋")
         self.battery_label.hide()  # 默认隐藏电池图标
         
+        # 电池电量百分比，与图标分开，电量变化时不需要重新绘制图标
+        self.battery_percent_label = QLabel(self)
+        self.battery_percent_label.setFont(QFont('Arial', 10))
+        self.battery_percent_label.setStyleSheet("color: white;")
+        self.battery_percent_label.hide()  # 默认隐藏电量百分比
+        
         # 创建日历图标标签
         self.calendar_label = QLabel(self)
-        self.calendar_label.setText("📅")
-        self.calendar_label.setFont(QFont('Arial', 14))
-        self.calendar_label.setStyleSheet("color: white;")
+        self.set_icon(self.calendar_label, "📅")
         self.calendar_label.setToolTip("点击查看日期")
         self.calendar_label.hide()  # 默认隐藏日历图标
         
@@ -191,10 +385,13 @@ class DynamicIsland(QWidget):
         self.time_label.setStyleSheet("color: white;")
         
         # 创建通知图标
+        # 铃铛使用与旋转帧大小相同的位图，摇摆时标签尺寸不变
         self.notification_label = QLabel(self)
-        self.notification_label.setText("🔔")
-        self.notification_label.setFont(QFont('Arial', 14))
-        self.notification_label.setStyleSheet("color: white;")
+        self.set_icon(self.notification_label, "🔔", 0.0)
+        
+        # 展开时显示的专辑封面，没有封面时保持隐藏
+        self.album_art_label = QLabel(self)
+        self.album_art_label.hide()
         
         # 展开时的额外信息
         self.extra_info_label = QLabel(self)
@@ -203,35 +400,43 @@ class DynamicIsland(QWidget):
         self.extra_info_label.setStyleSheet("color: white;")
         self.extra_info_label.hide()
         
+        # 展开时显示的电池剩余时间估计
+        self.battery_estimate_label = QLabel(self)
+        self.battery_estimate_label.setFont(QFont('Arial', 10))
+        self.battery_estimate_label.setStyleSheet("color: white;")
+        self.battery_estimate_label.hide()
+        
         # 添加到布局
         layout.addWidget(self.volume_label)
         layout.addWidget(self.volume_percent_label)
         layout.addWidget(self.battery_label)
+        layout.addWidget(self.battery_percent_label)
         layout.addWidget(self.calendar_label)
         layout.addWidget(self.calendar_detail_label)
         layout.addWidget(self.time_label)
         layout.addWidget(self.notification_label)
+        layout.addWidget(self.album_art_label)
         layout.addWidget(self.extra_info_label)
+        layout.addWidget(self.battery_estimate_label)
         
         # 更新时间、音量和电池信息
-        self.update_time()
-        self.update_volume_info()
-        self.update_battery_info()
-        
-        # 设置定时器，每秒更新时间和音量
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_time)
-        self.timer.start(1000)
-        
-        # 设置音量更新定时器
-        self.volume_timer = QTimer(self)
-        self.volume_timer.timeout.connect(self.update_volume_info)
-        self.volume_timer.start(1000)
+        self.update_time(read_time_info())
+        try:
+            volume_info = read_volume_info()
+        except Exception:
+            volume_info = None
+        if volume_info is None and "volume" in self.snapshot:
+            # 音量后端还没有初始化，先显示快照中的音量
+            volume_info = (self.snapshot["volume"], self.snapshot.get("mute", False))
+        self.update_volume_info(volume_info)
+        try:
+            self.update_battery_info(self.read_battery_sample())
+        except Exception:
+            battery = self.snapshot.get("battery")
+            self.update_battery_info((battery[0], battery[1], "") if battery else None)
         
-        # 设置电池电量更新定时器
-        self.battery_timer = QTimer(self)
-        self.battery_timer.timeout.connect(self.update_battery_info)
-        self.battery_timer.start(5000)  # 每5秒更新一次电池信息
+        # 首次显示前立即应用，不等待事件循环
+        self.view_model.flush()
         
         # 创建全局快捷键
         self.shortcut_volume_up = QShortcut(QKeySequence("Ctrl+Up"), self)
@@ -242,17 +447,225 @@ class DynamicIsland(QWidget):
         
         self.shortcut_volume_mute = QShortcut(QKeySequence("Ctrl+M"), self)
         self.shortcut_volume_mute.activated.connect(self.toggle_mute)
+        
+        self.shortcut_debug = QShortcut(QKeySequence("Ctrl+Shift+D"), self)
+        self.shortcut_debug.activated.connect(self.toggle_debug_mode)
+        if self.debug_mode:
+            self.show_debug_overlay()
+    
+    def init_sensor_hub(self, event_source=None):
+        # 时间、音量、电池和音乐探针由一个后台线程统一调度
+        self.sensor_hub = SensorHub()
+        self.sensor_hub.sensors_updated.connect(self.on_sensors_updated)
+        self.sensor_hub.add_clock_probe("time", read_time_info, CLOCK_BOUNDARY)
+        self.sensor_hub.add_probe("battery", self.read_battery_sample, SENSOR_INTERVALS["battery"])
+        
+        # 自适应采样：电池供电、空闲或锁屏时放慢采样，有操作或事件时恢复全速
+        self.sampling_policy = SamplingPolicy({"battery": SENSOR_INTERVALS["battery"]})
+        
+        # 订阅窗口事件，音乐探针在事件发生时执行，轮询只作为兜底
+        if event_source is None:
+            event_source = window_events.create_default_event_source()
+        self.window_event_source = event_source
+        music_interval = SENSOR_INTERVALS["music"]
+        # 事件线程上一次安排音乐探针执行的时间
+        self.music_wake_at = 0.0
+        if event_source is not None:
+            # 只关心播放器窗口的标题变化，浏览器、终端等改标题的事件在钩子线程中直接丢弃
+            if player_states is not None:
+                event_source.set_title_filter(player_states.is_tracked_window)
+            event_source.subscribe(self.on_window_event)
+            if event_source.start():
+                music_interval = SENSOR_INTERVALS["music_event_driven"]
+        
+        # Linux上没有窗口标题可用，改为订阅MPRIS播放器的属性变化推送
+        self.music_source = None
+        if has_music_utils and not music_utils.has_win32:
+            music_source = mpris_music.create_default_source()
+            if music_source is not None and music_source.start():
+                self.music_source = music_source
+                music_utils.use_music_source(music_source)
+                music_source.subscribe(self.on_music_pushed)
+                music_interval = SENSOR_INTERVALS["music_event_driven"]
+        self.sensor_hub.add_probe("music", self.read_music_sample, music_interval)
+        self.sampling_policy.set_base_interval("music", music_interval)
+        
+        # 订阅音量变化推送，无法注册回调时才定时轮询
+        self.volume_push_enabled = False
+        if has_volume_utils:
+            self.volume_push_enabled = volume_utils.subscribe(self.on_volume_pushed)
+        volume_interval = None if self.volume_push_enabled else SENSOR_INTERVALS["volume"]
+        self.sensor_hub.add_probe("volume", read_volume_info, volume_interval)
+        self.sampling_policy.set_base_interval("volume", volume_interval)
+        
+        self.sensor_hub.add_probe("power", self.refresh_sampling_profile, SENSOR_INTERVALS["power"])
+        
+        self.sensor_hub.start()
+    
+    def init_album_art(self, art_source=None):
+        # 专辑封面在后台线程获取和解码，GUI线程只缓存转换好的位图
+        if art_source is None:
+            art_source = album_art.create_default_source(self.music_source)
+        self.album_art_cache = album_art.ThumbnailLRU(ALBUM_ART_CACHE_SIZE)
+        self.album_art_key = None
+        self.album_art_loader = None
+        self.album_art_retries = 0
+        self.album_art_retry_timer = QTimer(self)
+        self.album_art_retry_timer.setSingleShot(True)
+        self.album_art_retry_timer.timeout.connect(self.retry_album_art)
+        if art_source is not None:
+            # 磁盘缓存与状态快照放在同一个目录下
+            cache_dir = os.path.join(os.path.dirname(self.state_snapshot.path), "album_art")
+            self.album_art_loader = album_art.AlbumArtLoader(art_source, album_art.DiskArtCache(cache_dir))
+            self.album_art_loader.art_ready.connect(self.on_album_art_ready)
+            self.album_art_loader.start()
+        self.request_album_art()
+    
+    def read_music_sample(self):
+        # 音乐探针（传感器线程），标题变化还没有稳定时在稳定窗口结束后再读一次
+        music_info = read_music_info()
+        if player_states is not None and player_states.pending():
+            self.sensor_hub.wake("music", MUSIC_STABLE_WINDOW)
+        return music_info
+    
+    def read_battery_sample(self):
+        # 电池探针（传感器线程），记录采样并返回 (电量, 是否在充电, 剩余时间说明)
+        battery_info = read_battery_info()
+        if battery_info is None:
+            return None
+        percent, plugged = battery_info
+        self.battery_history.add(time.monotonic(), percent, plugged)
+        
+        # 速率稳定时放慢电池采样
+        if hasattr(self, 'sampling_policy'):
+            interval = self.battery_history.suggested_interval(SENSOR_INTERVALS["battery"])
+            if self.sampling_policy.set_base_interval("battery", interval):
+                self.sensor_hub.set_interval("battery", self.sampling_policy.effective_interval("battery"))
+        
+        # 显示和去重使用整数电量，估算使用带小数的电量
+        return int(percent), plugged, format_battery_estimate(self.battery_history)
+    
+    def refresh_sampling_profile(self):
+        # 电源探针（传感器线程），重新评估采样档位
+        if self.sampling_policy.update():
+            self.apply_sampling_profile()
+        return self.sampling_policy.profile
+    
+    def apply_sampling_profile(self):
+        # 把当前档位下的实际间隔应用到各探针，可在任意线程调用
+        for name, interval in self.sampling_policy.effective_intervals().items():
+            self.sensor_hub.set_interval(name, interval)
+    
+    def on_user_activity(self):
+        # 用户操作或收到系统事件，立即恢复全速采样
+        if self.sampling_policy.notify_activity():
+            self.apply_sampling_profile()
+    
+    def status_lines(self):
+        # 运行状态，用于在右键菜单中查看
+        view_stats = self.view_model.stats()
+        lines = [
+            f"传感器唤醒: {self.sensor_hub.wakeups_per_minute()} 次/分钟",
+            f"跳过的标签重绘: {view_stats['skipped']} 次（实际更新 {view_stats['applied']} 次）",
+            f"采样档位: {self.sampling_policy.profile}"
+        ]
+        if player_states is not None:
+            player_stats = player_states.stats()
+            lines.append(
+                f"播放器窗口枚举: {player_stats['enumerations']} 次（固定窗口命中 {player_stats['pinned_hits']} 次）"
+            )
+        if self.album_art_loader is not None:
+            art_stats = self.album_art_loader.stats()
+            lines.append(
+                f"专辑封面: 解码 {art_stats['decodes']} 次，内存命中 {self.album_art_cache.hits} 次，"
+                f"磁盘命中 {art_stats['disk_hits']} 次"
+            )
+        for name, interval in self.sampling_policy.effective_intervals().items():
+            lines.append(f"  {name}: {'仅推送' if interval is None else f'{interval:g} 秒'}")
+        lines.append("启动耗时:")
+        for line in STARTUP_TRACE.summary_lines():
+            lines.append(f"  {line}")
+        return lines
+    
+    def nativeEvent(self, eventType, message):
+        # 休眠唤醒或系统时间变化后立即刷新时钟，不等下一个整分钟
+        if eventType == "windows_generic_MSG":
+            try:
+                from ctypes import wintypes
+                msg = wintypes.MSG.from_address(int(message))
+                if msg.message == WM_TIMECHANGE or (
+                        msg.message == WM_POWERBROADCAST
+                        and msg.wParam in (PBT_APMRESUMESUSPEND, PBT_APMRESUMEAUTOMATIC)):
+                    self.sensor_hub.resync()
+            except Exception:
+                pass
+        return False, 0
+    
+    def on_window_event(self, event_type, hwnd):
+        # 窗口事件回调（事件线程），唤醒音乐探针；已经安排了还没执行的唤醒时不再重复安排，
+        # 两次唤醒之间至少间隔MUSIC_EVENT_MIN_SPACING
+        now = time.monotonic()
+        if now >= self.music_wake_at:
+            self.music_wake_at = max(now + MUSIC_EVENT_DEBOUNCE, self.music_wake_at + MUSIC_EVENT_MIN_SPACING)
+            self.sensor_hub.wake("music", self.music_wake_at - now)
+        
+        # 标题变化非常频繁，只有前台窗口切换才视为用户操作
+        if event_type == window_events.EVENT_FOREGROUND:
+            self.on_user_activity()
+    
+    def on_music_pushed(self, song, artist):
+        # 音乐来源推送的歌曲变化（监听线程），唤醒音乐探针读取
+        self.sensor_hub.wake("music")
+    
+    def on_volume_pushed(self, volume, mute):
+        # 音量推送回调（COM线程），交给传感器中心去重后发送
+        self.sensor_hub.push("volume", (round(volume * 100), bool(mute)))
+        self.on_user_activity()
+    
+    def on_sensors_updated(self, changes):
+        # 传感器中心发来的批量更新，只包含变化的字段
+        if "time" in changes:
+            with self.frame_stats.timed("update_time"):
+                self.update_time(changes["time"])
+        if "volume" in changes:
+            with self.frame_stats.timed("update_volume_info"):
+                self.update_volume_info(changes["volume"])
+        if "battery" in changes:
+            with self.frame_stats.timed("update_battery_info"):
+                self.update_battery_info(changes["battery"])
+            battery_info = changes["battery"]
+            if battery_info is not None and self.sampling_policy.set_on_battery(not battery_info[1]):
+                self.apply_sampling_profile()
+        if "music" in changes:
+            with self.frame_stats.timed("update_music_info"):
+                self.update_music_info(*changes["music"])
+        
+        if len(self.live_fields) < len(LIVE_FIELDS):
+            for name in LIVE_FIELDS:
+                # 音量后端初始化之前音量探针返回None，不算实时数据
+                if name in changes and (name != "volume" or changes[name] is not None):
+                    self.mark_live(name)
     
     def paintEvent(self, event):
-        # 绘制圆角窗口
+        # 绘制圆角窗口，圆角来自缓存的角块，动画中改变大小也不需要重新抗锯齿绘制
+        start = time.perf_counter()
         painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
+        self.background_cache.paint(
+            painter,
+            self.width(),
+            self.height(),
+            self.background_radius,
+            (0, 0, 0, self.background_alpha),
+            self.devicePixelRatioF()
+        )
+        painter.end()
+        self.frame_stats.record("paint", time.perf_counter() - start)
         
-        # 绘制背景
-        rect = self.rect()
-        painter.setBrush(QBrush(QColor(0, 0, 0, 200)))
-        painter.setPen(Qt.NoPen)
-        painter.drawRoundedRect(rect, 20, 20)
+        if not self.first_frame_painted:
+            self.first_frame_painted = True
+            STARTUP_TRACE.mark("first_paint")
+            if self.debug_mode:
+                print("启动耗时: " + ", ".join(STARTUP_TRACE.summary_lines()))
     
     def mousePressEvent(self, event):
         # 鼠标按下事件，用于拖动窗口和点击切换展开/收起
@@ -275,8 +688,8 @@ class DynamicIsland(QWidget):
             if distance > 5:  # 5像素阈值
                 self.draggable = True
                 
-                # 使用统一的方法停止所有动画，避免拖动时与动画冲突
-                self.stop_all_animations()
+                # 停止几何动画，避免拖动时与动画冲突
+                self.geometry_animator.stop()
                 
                 # 移动窗口
                 self.move(event.globalPos() - self.drag_position)
@@ -296,181 +709,6 @@ class DynamicIsland(QWidget):
             # 重置拖动状态
             self.draggable = False
     
-    def stop_all_animations(self):
-        # 停止并移除所有活动动画
-        for attr_name in ['hover_animation', 'expand_animation', 'collapse_animation', 'bell_animation']:
-            if hasattr(self, attr_name):
-                animation = getattr(self, attr_name)
-                # 检查动画是否正在运行
-                from PyQt5.QtCore import QParallelAnimationGroup, QPropertyAnimation, QSequentialAnimationGroup
-                if isinstance(animation, QPropertyAnimation) and animation.state() == QPropertyAnimation.Running:
-                    animation.stop()
-                elif isinstance(animation, (QParallelAnimationGroup, QSequentialAnimationGroup)) and animation.state() == QParallelAnimationGroup.Running:
-                    animation.stop()
-                delattr(self, attr_name)
-    
-    def toggle_expand(self):
-        # 切换展开/收起状态
-        self.expanded = not self.expanded
-        
-        # 首先停止所有可能的动画
-        self.stop_all_animations()
-        
-        if self.expanded:
-            # 展开时的动画
-            new_width = self.original_width + 100
-            new_height = self.original_height + 30
-            
-            # 获取当前窗口位置
-            current_geometry = self.geometry()
-            
-            # 保持窗口中心位置不变，计算新的x坐标
-            current_center = current_geometry.x() + current_geometry.width() // 2
-            new_x = current_center - new_width // 2
-            new_y = 10  # 固定在顶部10像素处
-            
-            # 显示额外信息
-            self.extra_info_label.show()
-            
-            # 增加背景透明度
-            palette = self.palette()
-            palette.setColor(QPalette.Window, QColor(0, 0, 0, 240))
-            self.setPalette(palette)
-            
-            # 确保动画结束后窗口位置正确
-            def on_expand_finished():
-                self.setGeometry(new_x, new_y, new_width, new_height)
-            
-            # 创建新的窗口矩形
-            from PyQt5.QtCore import QRect
-            new_rect = QRect(new_x, new_y, new_width, new_height)
-            
-            # 使用新的几何动画方法
-            self.expand_animation = self.create_geometry_animation(
-                current_geometry,
-                new_rect,
-                duration=400,
-                finished_callback=on_expand_finished
-            )
-            
-            # 启动动画
-            self.expand_animation.start()
-            
-        else:
-            # 获取当前窗口位置
-            current_geometry = self.geometry()
-            
-            # 保持窗口中心位置不变，计算新的x坐标
-            current_center = current_geometry.x() + current_geometry.width() // 2
-            new_x = current_center - self.original_width // 2
-            new_y = 10  # 固定在顶部10像素处
-            
-            # 隐藏额外信息
-            self.extra_info_label.hide()
-            
-            # 恢复背景透明度
-            palette = self.palette()
-            palette.setColor(QPalette.Window, QColor(0, 0, 0, 200))
-            self.setPalette(palette)
-            
-            # 确保动画结束后窗口位置正确
-            def on_collapse_finished():
-                self.setGeometry(new_x, new_y, self.original_width, self.original_height)
-            
-            # 创建新的窗口矩形
-            from PyQt5.QtCore import QRect
-            new_rect = QRect(new_x, new_y, self.original_width, self.original_height)
-            
-            # 使用新的几何动画方法
-            self.collapse_animation = self.create_geometry_animation(
-                current_geometry,
-                new_rect,
-                duration=400,
-                finished_callback=on_collapse_finished
-            )
-            
-            # 启动动画
-            self.collapse_animation.start()
-    
-    def enterEvent(self, event):
-        # 鼠标进入事件，放大窗口
-        if not self.expanded:  # 只有在未展开状态下才执行悬停动画
-            # 停止所有动画
-            self.stop_all_animations()
-            
-            new_width = self.original_width + 40
-            new_height = self.original_height + 10
-            
-            # 获取当前窗口位置
-            current_geometry = self.geometry()
-            
-            # 保持窗口中心位置不变，计算新的x坐标
-            current_center = current_geometry.x() + current_geometry.width() // 2
-            new_x = current_center - new_width // 2
-            new_y = 10  # 固定在顶部10像素处
-            
-            # 增加背景透明度
-            palette = self.palette()
-            palette.setColor(QPalette.Window, QColor(0, 0, 0, 230))
-            self.setPalette(palette)
-            
-            # 确保动画结束后窗口位置正确
-            def on_hover_enter_finished():
-                self.setGeometry(new_x, new_y, new_width, new_height)
-            
-            # 创建新的窗口矩形
-            from PyQt5.QtCore import QRect
-            new_rect = QRect(new_x, new_y, new_width, new_height)
-            
-            # 使用新的几何动画方法
-            self.hover_animation = self.create_geometry_animation(
-                current_geometry,
-                new_rect,
-                duration=300,
-                finished_callback=on_hover_enter_finished
-            )
-            
-            # 启动动画
-            self.hover_animation.start()
-        
-    def leaveEvent(self, event):
-        # 鼠标离开事件，恢复原始大小
-        if not self.expanded:  # 只有在未展开状态下才执行悬停动画
-            # 停止所有动画
-            self.stop_all_animations()
-            
-            # 获取当前窗口位置
-            current_geometry = self.geometry()
-            
-            # 保持窗口中心位置不变，计算新的x坐标
-            current_center = current_geometry.x() + current_geometry.width() // 2
-            new_x = current_center - self.original_width // 2
-            new_y = 10  # 固定在顶部10像素处
-            
-            # 恢复背景透明度
-            palette = self.palette()
-            palette.setColor(QPalette.Window, QColor(0, 0, 0, 200))
-            self.setPalette(palette)
-            
-            # 确保动画结束后窗口位置正确
-            def on_hover_leave_finished():
-                self.setGeometry(new_x, new_y, self.original_width, self.original_height)
-            
-            # 创建新的窗口矩形
-            from PyQt5.QtCore import QRect
-            new_rect = QRect(new_x, new_y, self.original_width, self.original_height)
-            
-            # 使用新的几何动画方法
-            self.hover_animation = self.create_geometry_animation(
-                current_geometry,
-                new_rect,
-                duration=300,
-                finished_callback=on_hover_leave_finished
-            )
-            
-            # 启动动画
-            self.hover_animation.start()
-    
     def contextMenuEvent(self, event):
         # 右键菜单事件
         from PyQt5.QtWidgets import QMenu
@@ -480,192 +718,273 @@ class DynamicIsland(QWidget):
         if action == exit_action:
             QApplication.quit()
         
-    def create_animation(self, property_name, start_value, end_value, duration=300, finished_callback=None):
-        # 不直接支持geometry属性的动画
-        if property_name == b"geometry":
-            # 使用几何动画方法替代
-            from PyQt5.QtCore import QRect
-            if isinstance(start_value, QRect) and isinstance(end_value, tuple):
-                end_rect = QRect(*end_value)
-                return self.create_geometry_animation(start_value, end_rect, duration, finished_callback)
-            return None
-            
-        # 创建并配置动画
-        animation = QPropertyAnimation(self, property_name)
-        animation.setDuration(duration)
-        animation.setEasingCurve(QEasingCurve.OutQuad)
-        
-        # 设置起始值和结束值
-        animation.setStartValue(start_value)
-        animation.setEndValue(end_value)
-        
-        if finished_callback:
-            animation.finished.connect(finished_callback)
-        return animation
-        
-    def create_geometry_animation(self, start_rect, end_rect, duration=300, finished_callback=None):
-        # 创建位置和大小的动画组
-        from PyQt5.QtCore import QParallelAnimationGroup
-        
-        # 创建位置动画
-        pos_animation = QPropertyAnimation(self, b"pos")
-        pos_animation.setDuration(duration)
-        pos_animation.setEasingCurve(QEasingCurve.OutQuad)
-        pos_animation.setStartValue(start_rect.topLeft())
-        pos_animation.setEndValue(end_rect.topLeft())
-        
-        # 创建大小动画
-        size_animation = QPropertyAnimation(self, b"size")
-        size_animation.setDuration(duration)
-        size_animation.setEasingCurve(QEasingCurve.OutQuad)
-        size_animation.setStartValue(start_rect.size())
-        size_animation.setEndValue(end_rect.size())
-        
-        # 创建动画组
-        animation_group = QParallelAnimationGroup(self)
-        animation_group.addAnimation(pos_animation)
-        animation_group.addAnimation(size_animation)
-        
-        if finished_callback:
-            animation_group.finished.connect(finished_callback)
-        
-        return animation_group
+    def set_icon(self, label, glyph, angle=None):
+        # 从图集中取出当前缩放比例下的图标位图，图标没有变化时不更新标签
+        dpr = self.devicePixelRatioF()
+        self.icon_glyphs[label] = (glyph, angle)
+        pixmap = self.glyph_atlas.pixmap(glyph, dpr, angle)
+        self.view_model.set_pixmap(label, (glyph, angle, dpr), pixmap)
+    
+    def refresh_icons(self):
+        # 缩放比例变化后按新的设备像素比重新取出所有图标
+        for label, (glyph, angle) in list(self.icon_glyphs.items()):
+            self.set_icon(label, glyph, angle)
+    
+    def showEvent(self, event):
+        # 窗口显示后才有对应的原生窗口，此时监听屏幕切换
+        window = self.windowHandle()
+        if window is not None and not self.screen_change_connected:
+            window.screenChanged.connect(self.on_screen_changed)
+            self.screen_change_connected = True
+        super().showEvent(event)
+        
+        if not self.backend_init_started:
+            self.backend_init_started = True
+            if has_volume_utils:
+                volume_utils.initialize_in_background(self.volume_backend_ready.emit)
+            else:
+                self.mark_live("volume")
+    
+    def on_volume_backend_ready(self):
+        # 音量后端初始化完成（GUI线程），改为推送更新并立即读取一次音量
+        STARTUP_TRACE.mark("volume_backend")
+        if not volume_utils.volume_initialized:
+            # 音量功能不可用，没有更准确的音量可以显示
+            self.mark_live("volume")
+            return
+        self.volume_push_enabled = volume_utils.subscribe(self.on_volume_pushed)
+        volume_interval = None if self.volume_push_enabled else SENSOR_INTERVALS["volume"]
+        if self.sampling_policy.set_base_interval("volume", volume_interval):
+            self.sensor_hub.set_interval("volume", self.sampling_policy.effective_interval("volume"))
+        self.sensor_hub.wake("volume")
+    
+    def on_screen_changed(self, screen):
+        # 移动到缩放比例不同的屏幕时图集会按新的比例栅格化
+        self.refresh_icons()
+        self.request_album_art()
+    
+    def toggle_debug_mode(self):
+        # 切换调试模式，显示或隐藏性能浮层
+        self.debug_mode = not self.debug_mode
+        if self.debug_mode:
+            self.show_debug_overlay()
+        elif self.debug_overlay is not None:
+            self.debug_overlay_timer.stop()
+            self.debug_overlay.hide()
+    
+    def show_debug_overlay(self):
+        # 性能浮层是一个独立的置顶小窗口，显示在岛的下方
+        if self.debug_overlay is None:
+            self.debug_overlay = QLabel()
+            self.debug_overlay.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)
+            self.debug_overlay.setAttribute(Qt.WA_TransparentForMouseEvents)
+            self.debug_overlay.setFont(QFont('Consolas', 9))
+            self.debug_overlay.setStyleSheet("background-color: rgba(0, 0, 0, 180); color: #7CFC00; padding: 4px;")
+            self.debug_overlay_timer = QTimer(self)
+            self.debug_overlay_timer.timeout.connect(self.update_debug_overlay)
+        self.update_debug_overlay()
+        self.debug_overlay.show()
+        self.debug_overlay_timer.start(DEBUG_OVERLAY_INTERVAL)
+    
+    def update_debug_overlay(self):
+        # 刷新浮层上的p50/p99和掉帧次数
+        self.debug_overlay.setText("\n".join(self.frame_stats.summary_lines()))
+        self.debug_overlay.adjustSize()
+        geometry = self.geometry()
+        self.debug_overlay.move(geometry.center().x() - self.debug_overlay.width() // 2, geometry.bottom() + 8)
+    
+    def record_state(self, **fields):
+        # 更新状态快照，有变化时延迟写入，合并连续的变化
+        if self.state_snapshot.update(**fields):
+            self.snapshot_timer.start(SNAPSHOT_DEBOUNCE)
+    
+    def save_state(self):
+        # 立即写入未保存的状态快照
+        self.snapshot_timer.stop()
+        self.state_snapshot.save()
+    
+    def mark_live(self, name):
+        # 探针收到实时数据，全部收到后记录显示内容准确的时间
+        self.live_fields.add(name)
+        if all(field in self.live_fields for field in LIVE_FIELDS):
+            STARTUP_TRACE.mark("accurate_display")
+    
+    def on_about_to_quit(self):
+        # 退出时保存状态快照，调试模式下同时保存统计数据
+        self.save_state()
+        if not self.debug_mode:
+            return
+        path = os.path.abspath(FRAME_STATS_FILE)
+        try:
+            self.frame_stats.dump_json(path, {"startup_ms": STARTUP_TRACE.to_dict()})
+            print(f"帧耗时统计已保存到 {path}")
+        except OSError as e:
+            print(f"保存帧耗时统计失败: {e}")
     
     def ring_bell_animation(self):
-        # 实现铃铛摇摆动画
-        # 首先停止所有可能的铃铛动画
+        # 实现铃铛摇摆动画，旋转帧在图集中只绘制一次
         if hasattr(self, 'bell_rotation_timer'):
             self.bell_rotation_timer.stop()
             delattr(self, 'bell_rotation_timer')
         
-        # 初始化旋转角度和动画状态
-        self.bell_rotation_angle = 0
-        self.bell_rotation_direction = 1  # 1表示向右旋转，-1表示向左旋转
+        self.glyph_atlas.rotation_frames("🔔", BELL_SWING_ANGLES, self.devicePixelRatioF())
         self.bell_rotation_step = 0
-        self.bell_rotation_steps = 10
-        self.bell_rotation_max_angle = 15
         
         # 创建定时器控制摇摆动画
         self.bell_rotation_timer = QTimer(self)
         self.bell_rotation_timer.timeout.connect(self.update_bell_rotation)
-        self.bell_rotation_timer.start(50)
+        self.bell_rotation_timer.start(BELL_FRAME_INTERVAL)
     
     def update_bell_rotation(self):
-        # 更新铃铛旋转角度
-        self.bell_rotation_step += 1
+        # 切换到下一帧旋转位图
+        if self.bell_rotation_step >= len(BELL_SWING_ANGLES):
+            # 动画完成，回到静止帧并停止定时器
+            self.set_icon(self.notification_label, "🔔", 0.0)
+            self.bell_rotation_timer.stop()
+            delattr(self, 'bell_rotation_timer')
+            return
         
-        if self.bell_rotation_step <= self.bell_rotation_steps:
-            # 计算当前旋转角度
-            progress = self.bell_rotation_step / self.bell_rotation_steps
-            if self.bell_rotation_direction == 1:
-                self.bell_rotation_angle = self.bell_rotation_max_angle * progress
-            else:
-                self.bell_rotation_angle = self.bell_rotation_max_angle - (self.bell_rotation_max_angle * 2) * progress
-        else:
-            # 切换旋转方向
-            self.bell_rotation_direction *= -1
-            self.bell_rotation_step = 0
-            
-            # 检查是否完成了一个完整的摇摆周期
-            if self.bell_rotation_direction == 1 and self.bell_rotation_angle == 0:
-                # 动画完成，停止定时器
-                self.bell_rotation_timer.stop()
-                delattr(self, 'bell_rotation_timer')
-                return
-        
-        # 应用旋转效果
-        from PyQt5.QtGui import QFont
-        font = QFont('Arial', 14)
-        self.notification_label.setFont(font)
-        
-        # 使用HTML和CSS变换来实现旋转效果
-        rotation_style = f"style='transform: rotate({self.bell_rotation_angle}deg); display: inline-block;'"
-        self.notification_label.setText(f"<span {rotation_style}>🔔</span>")
+        self.set_icon(self.notification_label, "🔔", BELL_SWING_ANGLES[self.bell_rotation_step])
+        self.bell_rotation_step += 1
     
     def update_music_info(self, song, artist):
         # 更新音乐信息
         self.current_song = song
         self.current_artist = artist
-        self.extra_info_label.setText(f"正在播放: {song} - {artist}")
+        self.view_model.set_text(self.extra_info_label, f"正在播放: {song} - {artist}")
+        self.record_state(song=song, artist=artist)
+        self.request_album_art()
+    
+    def request_album_art(self):
+        # 请求当前歌曲的封面，内存缓存命中时直接显示，不经过加载线程
+        if self.album_art_loader is None or self.current_song == "无音乐播放":
+            self.album_art_key = None
+            self.album_art_retry_timer.stop()
+            self.show_album_art(None)
+            return
+        
+        size = round(ALBUM_ART_SIZE * self.devicePixelRatioF())
+        key = (album_art.track_key(self.current_song, self.current_artist), size)
+        if key == self.album_art_key:
+            return
+        self.album_art_key = key
+        self.album_art_retries = 0
+        self.album_art_retry_timer.stop()
+        if key in self.album_art_cache:
+            self.show_album_art(self.album_art_cache.get(key))
+        else:
+            self.show_album_art(None)
+            self.album_art_loader.request(self.current_song, self.current_artist, size)
+    
+    def on_album_art_ready(self, key, image, confirmed):
+        # 加载线程完成解码，转换为位图后缓存，之后重复播放和展开收起都直接使用
+        if not confirmed:
+            # 来源还不能确认是这首歌，不缓存，稍后重新请求
+            if key == self.album_art_key and self.album_art_retries < ALBUM_ART_MAX_RETRIES:
+                self.album_art_retries += 1
+                self.album_art_retry_timer.start(ALBUM_ART_RETRY_INTERVAL)
+            return
+        
+        pixmap = None
+        if image is not None:
+            pixmap = QPixmap.fromImage(image)
+            pixmap.setDevicePixelRatio(key[1] / ALBUM_ART_SIZE)
+        self.album_art_cache.put(key, pixmap)
+        if key == self.album_art_key:
+            self.show_album_art(pixmap)
     
-    def update_volume_info(self):
+    def retry_album_art(self):
+        # 重新请求还没有确定结果的当前歌曲封面
+        key = self.album_art_key
+        if key is None or key in self.album_art_cache or self.album_art_loader is None:
+            return
+        (song, artist), size = key
+        self.album_art_loader.request(song, artist, size)
+    
+    def show_album_art(self, pixmap):
+        # 只在展开状态下显示封面，位图没有变化时标签不会更新
+        self.album_art_pixmap = pixmap
+        if pixmap is None:
+            self.album_art_label.hide()
+            return
+        self.view_model.set_pixmap(self.album_art_label, self.album_art_key, pixmap)
+        if self.expanded:
+            self.album_art_label.show()
+    
+    def on_volume_changed(self, volume, mute):
+        # 音量命令执行完毕，交给传感器中心去重后发送
+        self.on_volume_pushed(volume, mute)
+    
+    def render_volume_info(self, volume_percent, mute):
+        # 更新音量图标
+        if mute:
+            self.set_icon(self.volume_label, "🔇")
+        elif volume_percent == 0:
+            self.set_icon(self.volume_label, "🔈")
+        elif volume_percent < 50:
+            self.set_icon(self.volume_label, "🔉")
+        else:
+            self.set_icon(self.volume_label, "🔊")
+        
+        # 更新音量百分比
+        self.view_model.set_text(self.volume_percent_label, f"{volume_percent}%")
+        self.record_state(volume=volume_percent, mute=mute)
+    
+    def update_volume_info(self, volume_info):
         # 更新音量显示信息
-        if has_volume_utils and volume_utils.volume_initialized:
-            try:
-                volume_percent = volume_utils.get_volume_percentage()
-                mute = volume_utils.get_mute()
-                
-                # 更新音量图标
-                if mute:
-                    self.volume_label.setText("🔇")
-                elif volume_percent == 0:
-                    self.volume_label.setText("🔈")
-                elif volume_percent < 50:
-                    self.volume_label.setText("🔉")
-                else:
-                    self.volume_label.setText("🔊")
-                
-                # 更新音量百分比
-                self.volume_percent_label.setText(f"{volume_percent}%")
-            except Exception:
-                # 如果出现错误，使用默认值
-                self.volume_label.setText("🔊")
-                self.volume_percent_label.setText("50%")
+        if volume_info is not None:
+            volume_percent, mute = volume_info
+            self.render_volume_info(volume_percent, mute)
         else:
             # 如果音量功能不可用，使用默认值
-            self.volume_label.setText("🔊")
-            self.volume_percent_label.setText("50%")
+            self.set_icon(self.volume_label, "🔊")
+            self.view_model.set_text(self.volume_percent_label, "50%")
     
-    def update_battery_info(self):
+    def update_battery_info(self, battery_info):
         # 更新电池信息显示
-        try:
-            battery = psutil.sensors_battery()
-            if battery:
-                percent = int(battery.percent)
-                plugged = battery.power_plugged
-                
-                # 根据充电状态和电量选择合适的图标
-                if plugged:
-                    # 充电状态
-                    if percent == 100:
-                        self.battery_label.setText("🔋100%")
-                    else:
-                        self.battery_label.setText(f"🔌{percent}%")
+        if battery_info is not None:
+            percent, plugged, estimate = battery_info
+            self.view_model.set_text(self.battery_estimate_label, estimate)
+            self.record_state(battery=(percent, plugged))
+            
+            self.view_model.set_text(self.battery_percent_label, f"{percent}%")
+            
+            # 根据充电状态和电量选择合适的图标
+            if plugged:
+                # 充电状态
+                if percent == 100:
+                    self.set_icon(self.battery_label, "🔋")
                 else:
-                    # 放电状态
-                    if percent > 80:
-                        self.battery_label.setText(f"🔋{percent}%")
-                    elif percent > 20:
-                        self.battery_label.setText(f"🔋{percent}%")
-                    else:
-                        self.battery_label.setText(f"🪫{percent}%")
+                    self.set_icon(self.battery_label, "🔌")
             else:
-                # 如果无法获取电池信息
-                self.battery_label.setText("🔋")
-        except Exception:
-            # 如果出现错误，使用默认值
-            self.battery_label.setText("🔋")
+                # 放电状态
+                if percent > 20:
+                    self.set_icon(self.battery_label, "🔋")
+                else:
+                    self.set_icon(self.battery_label, "🪫")
+        else:
+            # 如果无法获取电池信息
+            self.set_icon(self.battery_label, "🔋")
+            self.view_model.set_text(self.battery_percent_label, "")
     
     def volume_up(self):
-        # 增加音量
+        # 增加音量，交给音量命令线程执行
         if has_volume_utils and volume_utils.volume_initialized:
-            volume_utils.increase_volume(step=0.05)
-            self.update_volume_info()
+            self.volume_worker.change_volume(0.05)
     
     def volume_down(self):
-        # 减少音量
+        # 减少音量，交给音量命令线程执行
         if has_volume_utils and volume_utils.volume_initialized:
-            volume_utils.decrease_volume(step=0.05)
-            self.update_volume_info()
+            self.volume_worker.change_volume(-0.05)
     
     def toggle_mute(self):
-        # 切换静音状态
+        # 切换静音状态，交给音量命令线程执行
         if has_volume_utils and volume_utils.volume_initialized:
-            volume_utils.toggle_mute()
-            self.update_volume_info()
+            self.volume_worker.toggle_mute()
     
     def mousePressEvent(self, event):
         # 鼠标按下事件，用于拖动窗口和点击切换展开/收起
+        self.on_user_activity()
         if event.button() == Qt.LeftButton:
             # 激活窗口以确保接收键盘事件
             self.setFocus()
@@ -707,27 +1026,21 @@ class DynamicIsland(QWidget):
                 if not self.volume_label.geometry().contains(event.pos()) and not self.calendar_label.geometry().contains(event.pos()):
                     self.toggle_expand()
             
+            # 拖动结束后记录窗口位置
+            if self.draggable:
+                self.anchor = QPoint(self.x() + self.width() // 2, self.y())
+                self.record_state(window=(self.anchor.x() - self.original_width // 2, self.anchor.y()))
+            
             # 重置拖动状态
             self.draggable = False
     
     def enterEvent(self, event):
         # 鼠标进入事件，放大窗口
+        self.on_user_activity()
         if not self.expanded:  # 只有在未展开状态下才执行悬停动画
-            # 停止所有动画
-            self.stop_all_animations()
-            
             new_width = self.original_width + 40
             new_height = self.original_height + 10
             
-            # 使用availableGeometry获取可用屏幕区域（排除任务栏）
-            screen = QApplication.primaryScreen()
-            screen_geometry = screen.availableGeometry()
-            new_x = (screen_geometry.width() - new_width) // 2
-            new_y = 10  # 固定在顶部10像素处
-            
-            # 获取当前窗口位置作为动画起始点
-            current_geometry = self.geometry()
-            
             # 增加背景透明度
             palette = self.palette()
             palette.setColor(QPalette.Window, QColor(0, 0, 0, 230))
@@ -736,41 +1049,17 @@ class DynamicIsland(QWidget):
             # 显示音量百分比、电池图标和日历图标
             self.volume_percent_label.show()
             self.battery_label.show()
+            self.battery_percent_label.show()
             self.calendar_label.show()
             # 不自动显示日历详情，只有点击后才显示
             self.calendar_detail_label.hide()
             
-            # 确保动画结束后窗口位置正确
-            def on_hover_enter_finished():
-                self.setGeometry(new_x, new_y, new_width, new_height)
-            
-            # 使用统一的动画创建方法
-            self.hover_animation = self.create_animation(
-                b"geometry",
-                current_geometry,
-                (new_x, new_y, new_width, new_height),
-                duration=300,
-                finished_callback=on_hover_enter_finished
-            )
-            
-            # 启动动画
-            self.hover_animation.start()
+            # 从当前位置和速度转向新目标，动画进行中也不会跳变
+            self.geometry_animator.animate_to(self.anchored_rect(new_width, new_height), 300)
     
     def leaveEvent(self, event):
         # 鼠标离开事件，恢复原始大小
         if not self.expanded:  # 只有在未展开状态下才执行悬停动画
-            # 停止所有动画
-            self.stop_all_animations()
-            
-            # 使用availableGeometry获取可用屏幕区域（排除任务栏）
-            screen = QApplication.primaryScreen()
-            screen_geometry = screen.availableGeometry()
-            new_x = (screen_geometry.width() - self.original_width) // 2
-            new_y = 10  # 固定在顶部10像素处
-            
-            # 获取当前窗口位置作为动画起始点
-            current_geometry = self.geometry()
-            
             # 恢复背景透明度
             palette = self.palette()
             palette.setColor(QPalette.Window, QColor(0, 0, 0, 200))
@@ -780,23 +1069,11 @@ class DynamicIsland(QWidget):
             self.volume_percent_label.hide()
             self.calendar_detail_label.hide()
             self.battery_label.hide()
+            self.battery_percent_label.hide()
             self.calendar_label.hide()
             
-            # 确保动画结束后窗口位置正确
-            def on_hover_leave_finished():
-                self.setGeometry(new_x, new_y, self.original_width, self.original_height)
-            
-            # 使用统一的动画创建方法
-            self.hover_animation = self.create_animation(
-                b"geometry",
-                current_geometry,
-                (new_x, new_y, self.original_width, self.original_height),
-                duration=300,
-                finished_callback=on_hover_leave_finished
-            )
-            
-            # 启动动画
-            self.hover_animation.start()
+            # 从当前位置和速度转向新目标，动画进行中也不会跳变
+            self.geometry_animator.animate_to(self.anchored_rect(self.original_width, self.original_height), 300)
     
     def keyPressEvent(self, event):
         # 键盘事件处理，实现音量控制快捷键
@@ -814,31 +1091,31 @@ class DynamicIsland(QWidget):
         
         event.accept()
     
+    def anchored_rect(self, width, height):
+        # 以锚点为顶边中点计算目标位置，保持恢复或拖动后的位置，并限制在锚点所在屏幕的可用区域内
+        screen = QApplication.screenAt(self.anchor) or QApplication.primaryScreen()
+        available = screen.availableGeometry()
+        x = self.anchor.x() - width // 2
+        x = max(available.left(), min(x, available.right() + 1 - width))
+        return QRect(x, self.anchor.y(), width, height)
+    
     def toggle_expand(self):
         # 切换展开/收起状态
         self.expanded = not self.expanded
         
-        # 首先停止所有可能的动画
-        self.stop_all_animations()
-        
         if self.expanded:
             # 展开时的动画
             new_width = self.original_width + 100
             new_height = self.original_height + 30
             
-            # 使用availableGeometry获取可用屏幕区域（排除任务栏）
-            screen = QApplication.primaryScreen()
-            screen_geometry = screen.availableGeometry()
-            new_x = (screen_geometry.width() - new_width) // 2
-            new_y = 10  # 固定在顶部10像素处
-            
-            # 获取当前窗口位置作为动画起始点
-            current_geometry = self.geometry()
-            
             # 显示额外信息
+            if self.album_art_pixmap is not None:
+                self.album_art_label.show()
             self.extra_info_label.show()
+            self.battery_estimate_label.show()  # 展开时显示电池剩余时间
             self.volume_percent_label.show()  # 展开时显示音量百分比
             self.battery_label.show()  # 展开时显示电池图标
+            self.battery_percent_label.show()  # 展开时显示电量百分比
             self.calendar_label.show()  # 展开时显示日历图标
             # 不自动显示日历详情，只有点击后才显示
             self.calendar_detail_label.hide()
@@ -848,37 +1125,18 @@ class DynamicIsland(QWidget):
             palette.setColor(QPalette.Window, QColor(0, 0, 0, 240))
             self.setPalette(palette)
             
-            # 确保动画结束后窗口位置正确
-            def on_expand_finished():
-                self.setGeometry(new_x, new_y, new_width, new_height)
-            
-            # 使用统一的动画创建方法
-            self.expand_animation = self.create_animation(
-                b"geometry",
-                current_geometry,
-                (new_x, new_y, new_width, new_height),
-                duration=400,
-                finished_callback=on_expand_finished
-            )
-            
-            # 启动动画
-            self.expand_animation.start()
+            # 从当前位置和速度转向新目标，动画进行中也不会跳变
+            self.geometry_animator.animate_to(self.anchored_rect(new_width, new_height), 400)
             
         else:
-            # 使用availableGeometry获取可用屏幕区域（排除任务栏）
-            screen = QApplication.primaryScreen()
-            screen_geometry = screen.availableGeometry()
-            new_x = (screen_geometry.width() - self.original_width) // 2
-            new_y = 10  # 固定在顶部10像素处
-            
-            # 获取当前窗口位置作为动画起始点
-            current_geometry = self.geometry()
-            
             # 隐藏额外信息
+            self.album_art_label.hide()
             self.extra_info_label.hide()
+            self.battery_estimate_label.hide()  # 收起时隐藏电池剩余时间
             self.volume_percent_label.hide()  # 收起时隐藏音量百分比
             self.calendar_detail_label.hide()  # 收起时隐藏日历详情
             self.battery_label.hide()  # 收起时隐藏电池图标
+            self.battery_percent_label.hide()  # 收起时隐藏电量百分比
             self.calendar_label.hide()  # 收起时隐藏日历图标
             
             # 恢复背景透明度
@@ -886,21 +1144,8 @@ class DynamicIsland(QWidget):
             palette.setColor(QPalette.Window, QColor(0, 0, 0, 200))
             self.setPalette(palette)
             
-            # 确保动画结束后窗口位置正确
-            def on_collapse_finished():
-                self.setGeometry(new_x, new_y, self.original_width, self.original_height)
-            
-            # 使用统一的动画创建方法
-            self.collapse_animation = self.create_animation(
-                b"geometry",
-                current_geometry,
-                (new_x, new_y, self.original_width, self.original_height),
-                duration=400,
-                finished_callback=on_collapse_finished
-            )
-            
-            # 启动动画
-            self.collapse_animation.start()
+            # 从当前位置和速度转向新目标，动画进行中也不会跳变
+            self.geometry_animator.animate_to(self.anchored_rect(self.original_width, self.original_height), 400)
     
     def contextMenuEvent(self, event):
         # 右键菜单事件
@@ -920,27 +1165,29 @@ class DynamicIsland(QWidget):
             volume_down_action.triggered.connect(self.volume_down)
             mute_action.triggered.connect(self.toggle_mute)
         
+        # 运行状态菜单项（只读）
+        status_menu = menu.addMenu("运行状态")
+        for line in self.status_lines():
+            status_menu.addAction(line).setEnabled(False)
+        menu.addSeparator()
+        
         exit_action = menu.addAction("退出")
         action = menu.exec_(self.mapToGlobal(event.pos()))
         if action == exit_action:
             QApplication.quit()
     
-    def update_time(self):
-        from datetime import datetime
-        current_datetime = datetime.now()
-        current_time = current_datetime.strftime('%H:%M')
-        current_date = current_datetime.strftime('%m-%d')
+    def update_time(self, time_info):
+        time_text, calendar_text = time_info
         
         # 更新时间标签
-        self.time_label.setText(f"{current_date} {current_time}")
+        self.view_model.set_text(self.time_label, time_text)
         
         # 更新日历详情
-        week_day = ['周一', '周二', '周三', '周四', '周五', '周六', '周日'][current_datetime.weekday()]
-        full_date = current_datetime.strftime('%Y年%m月%d日')
-        self.calendar_detail_label.setText(f"{full_date} {week_day}")
+        self.view_model.set_text(self.calendar_detail_label, calendar_text)
     
     def keyPressEvent(self, event):
         # 键盘事件处理，用于音量控制快捷键
+        self.on_user_activity()
         modifiers = event.modifiers()
         key = event.key()
         
@@ -958,13 +1205,33 @@ class DynamicIsland(QWidget):
         event.accept()
     
     def closeEvent(self, event):
-        # 窗口关闭时停止音乐播放器线程
-        self.music_thread.stop()
-        self.music_thread.wait()
+        # 窗口关闭时停止传感器中心、窗口事件和音量订阅
+        if has_volume_utils:
+            volume_utils.unsubscribe(self.on_volume_pushed)
+        if self.window_event_source is not None:
+            self.window_event_source.unsubscribe(self.on_window_event)
+            self.window_event_source.stop()
+        if self.music_source is not None:
+            music_utils.use_music_source(None)
+            self.music_source.unsubscribe(self.on_music_pushed)
+            self.music_source.stop()
+        self.sensor_hub.stop()
+        self.sensor_hub.wait()
+        self.volume_worker.stop()
+        self.volume_worker.wait()
+        if self.album_art_loader is not None:
+            self.album_art_loader.stop()
+            self.album_art_loader.wait()
+        if self.debug_overlay is not None:
+            self.debug_overlay_timer.stop()
+            self.debug_overlay.close()
+        self.save_state()
         event.accept()
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
+    STARTUP_TRACE.mark("app")
     island = DynamicIsland()
     island.show()
+    STARTUP_TRACE.mark("show")
     sys.exit(app.exec_())
\ No newline at end of file
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+帧耗时统计模块，用对数分桶直方图记录绘制、动画帧间隔和回调耗时
+"""
+
+import json
+import math
+import time
+from contextlib import contextmanager
+
+# 动画的目标帧间隔（秒），帧间隔超过它的1.5倍时计为掉帧
+FRAME_BUDGET = 0.016
+
+
+class Histogram:
+    """
+    对数分桶直方图
+
+    桶的上界按固定比例增长，记录是O(1)，分位数的相对误差不超过增长比例
+    """
+
+    # 最小桶上界（秒）和相邻桶的比例
+    MIN_VALUE = 0.00001
+    GROWTH = 1.1
+    BUCKETS = 200
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        if seconds <= self.MIN_VALUE:
+            index = 0
+        else:
+            index = min(int(math.log(seconds / self.MIN_VALUE, self.GROWTH)) + 1, self.BUCKETS - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, p):
+        """
+        返回第p百分位所在桶的上界（秒），没有数据时返回0
+        """
+        if self.count == 0:
+            return 0.0
+        rank = math.ceil(self.count * p / 100.0)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.MIN_VALUE * self.GROWTH ** index, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000.0 if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1000.0,
+            "p99_ms": self.percentile(99) * 1000.0,
+            "max_ms": self.max * 1000.0
+        }
+
+
+class FrameStats:
+    """
+    帧耗时统计
+
+    按名称保存直方图；动画帧间隔单独统计掉帧次数
+    """
+
+    def __init__(self, frame_budget=FRAME_BUDGET):
+        self.frame_budget = frame_budget
+        self.histograms = {}
+        self.dropped_frames = 0
+        self.started = time.time()
+
+    def record(self, name, seconds):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.record(seconds)
+
+    @contextmanager
+    def timed(self, name):
+        """
+        记录with块的执行时间
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record_frame_interval(self, seconds):
+        """
+        记录相邻两个动画帧的间隔，超出预算的部分按帧数计为掉帧
+        """
+        self.record("frame_interval", seconds)
+        if seconds > self.frame_budget * 1.5:
+            self.dropped_frames += int(round(seconds / self.frame_budget)) - 1
+
+    def summary_lines(self):
+        """
+        返回用于调试浮层的摘要，每个直方图一行
+        """
+        lines = []
+        for name in sorted(self.histograms):
+            histogram = self.histograms[name]
+            lines.append(
+                f"{name}: p50 {histogram.percentile(50) * 1000:.2f} ms"
+                f" p99 {histogram.percentile(99) * 1000:.2f} ms (n={histogram.count})"
+            )
+        lines.append(f"掉帧: {self.dropped_frames}")
+        return lines
+
+    def to_dict(self):
+        return {
+            "started": self.started,
+            "duration": time.time() - self.started,
+            "frame_budget_ms": self.frame_budget * 1000.0,
+            "dropped_frames": self.dropped_frames,
+            "histograms": {name: histogram.to_dict() for name, histogram in self.histograms.items()}
+        }
+
+    def dump_json(self, path, extra=None):
+        """
+        把统计数据写入JSON文件，extra中的字段会一并写入
+        """
+        data = self.to_dict()
+        if extra:
+            data.update(extra)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+几何动画模块，用一个可随时改变目标的弹簧动画驱动窗口的位置和大小
+"""
+
+import math
+import time
+
+from PyQt5.QtCore import QObject, Qt, QTimer, pyqtSignal
+
+
+class GeometryAnimator(QObject):
+    """
+    窗口几何动画器
+
+    x、y、宽、高四个分量各自按临界阻尼弹簧运动，所有分量共用一个帧定时器，
+    每帧只调用一次setGeometry；动画途中修改目标时从当前位置和速度继续运动，
+    不会跳变，也不需要重新创建动画对象
+    """
+
+    finished = pyqtSignal()  # 信号：到达目标并停止
+
+    # 帧间隔（毫秒）
+    FRAME_INTERVAL = 16
+    # 单帧最大步长（秒），窗口被阻塞后恢复时避免一次跳得太远
+    MAX_STEP = 0.05
+    # 与目标的距离和速度都小于该值时直接吸附到目标（像素、像素/秒）
+    SETTLE_DISTANCE = 0.5
+    SETTLE_VELOCITY = 5.0
+
+    def __init__(self, widget, frame_stats=None):
+        super().__init__(widget)
+        self.widget = widget
+        # 可选的帧耗时统计，记录相邻两帧的实际间隔
+        self.frame_stats = frame_stats
+        # 依次为x、y、宽、高，预先分配，动画过程中只修改其中的值
+        self.position = [0.0, 0.0, 0.0, 0.0]
+        self.velocity = [0.0, 0.0, 0.0, 0.0]
+        self.target = [0.0, 0.0, 0.0, 0.0]
+        # 弹簧角频率，决定收敛速度
+        self.omega = 20.0
+        self.last_tick = 0.0
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.setInterval(self.FRAME_INTERVAL)
+        self.timer.timeout.connect(self.tick)
+
+    def is_running(self):
+        return self.timer.isActive()
+
+    def animate_to(self, rect, duration=300):
+        """
+        以约duration毫秒的时长运动到rect，动画途中调用时保留当前速度平滑转向
+        """
+        if not self.timer.isActive():
+            # 空闲时从窗口当前的几何位置出发（可能被拖动或直接设置过）
+            geometry = self.widget.geometry()
+            self.position[0] = float(geometry.x())
+            self.position[1] = float(geometry.y())
+            self.position[2] = float(geometry.width())
+            self.position[3] = float(geometry.height())
+            for i in range(4):
+                self.velocity[i] = 0.0
+            self.last_tick = time.monotonic()
+
+        self.target[0] = float(rect.x())
+        self.target[1] = float(rect.y())
+        self.target[2] = float(rect.width())
+        self.target[3] = float(rect.height())
+        # 临界阻尼弹簧约在8/omega秒后收敛到目标附近
+        self.omega = 8000.0 / max(duration, 1)
+
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def stop(self):
+        """
+        停在当前位置，速度清零
+        """
+        if self.timer.isActive():
+            self.timer.stop()
+        for i in range(4):
+            self.velocity[i] = 0.0
+
+    def tick(self):
+        now = time.monotonic()
+        interval = now - self.last_tick
+        self.last_tick = now
+        if self.frame_stats is not None:
+            self.frame_stats.record_frame_interval(interval)
+        dt = min(interval, self.MAX_STEP)
+
+        omega = self.omega
+        decay = math.exp(-omega * dt)
+        settled = True
+        for i in range(4):
+            # 临界阻尼弹簧的解析解，步长变化时也保持稳定
+            offset = self.position[i] - self.target[i]
+            velocity = self.velocity[i]
+            temp = (velocity + omega * offset) * dt
+            offset = (offset + temp) * decay
+            velocity = (velocity - omega * temp) * decay
+            self.position[i] = self.target[i] + offset
+            self.velocity[i] = velocity
+            if abs(offset) > self.SETTLE_DISTANCE or abs(velocity) > self.SETTLE_VELOCITY:
+                settled = False
+
+        if settled:
+            for i in range(4):
+                self.position[i] = self.target[i]
+                self.velocity[i] = 0.0
+            self.timer.stop()
+
+        self.widget.setGeometry(
+            round(self.position[0]),
+            round(self.position[1]),
+            round(self.position[2]),
+            round(self.position[3])
+        )
+
+        if settled:
+            self.finished.emit()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图标图集模块，把emoji图标预先栅格化为位图，按设备像素比缓存
+"""
+
+import math
+
+from PyQt5.QtCore import QPointF, QRectF, Qt
+from PyQt5.QtGui import QColor, QFont, QFontMetricsF, QPainter, QPixmap
+
+
+class GlyphAtlas:
+    """
+    emoji图标图集
+
+    每个图标在每种设备像素比下只绘制一次，之后标签直接切换位图，
+    不再经过文本排版和字体回退；旋转的帧绘制在同样大小的正方形里，
+    切换帧时标签尺寸不变，不会触发重新布局
+    """
+
+    def __init__(self, font=None, color=Qt.white):
+        self.font = font if font is not None else QFont('Arial', 14)
+        self.color = QColor(color)
+        # (图标, 设备像素比, 角度) -> 位图，角度为None表示不旋转的紧凑位图
+        self.cache = {}
+        # 统计：栅格化次数和命中次数
+        self.rasterized = 0
+        self.hits = 0
+
+    def clear(self):
+        self.cache.clear()
+
+    def pixmap(self, glyph, dpr, angle=None):
+        """
+        返回图标的位图；angle不为None时返回绕中心旋转angle度的正方形位图
+        """
+        key = (glyph, dpr, angle)
+        pixmap = self.cache.get(key)
+        if pixmap is not None:
+            self.hits += 1
+            return pixmap
+
+        metrics = QFontMetricsF(self.font)
+        width = metrics.horizontalAdvance(glyph)
+        height = metrics.height()
+        if angle is not None:
+            # 正方形边长取对角线长度，任意角度旋转都不会被裁掉
+            width = height = math.ceil(math.hypot(width, height))
+
+        pixmap = QPixmap(math.ceil(width * dpr), math.ceil(height * dpr))
+        pixmap.setDevicePixelRatio(dpr)
+        pixmap.fill(Qt.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHints(QPainter.Antialiasing | QPainter.TextAntialiasing | QPainter.SmoothPixmapTransform)
+        painter.setFont(self.font)
+        painter.setPen(self.color)
+        if angle is not None:
+            painter.translate(QPointF(width / 2, height / 2))
+            painter.rotate(angle)
+            painter.translate(QPointF(-width / 2, -height / 2))
+        painter.drawText(QRectF(0, 0, width, height), Qt.AlignCenter, glyph)
+        painter.end()
+
+        self.cache[key] = pixmap
+        self.rasterized += 1
+        return pixmap
+
+    def rotation_frames(self, glyph, angles, dpr):
+        """
+        预先绘制一组旋转帧，返回与angles一一对应的位图列表
+        """
+        return [self.pixmap(glyph, dpr, angle) for angle in angles]
+
+    def stats(self):
+        """
+        返回缓存统计
+        """
+        return {
+            "glyphs": len(self.cache),
+            "rasterized": self.rasterized,
+            "hits": self.hits
+        }
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MPRIS音乐来源模块，在Linux桌面上通过D-Bus会话总线订阅播放器的属性变化
+
+依赖jeepney（纯Python的D-Bus实现），没有安装时create_default_source返回None
+"""
+
+import sys
+import threading
+import time
+from contextlib import ExitStack
+
+try:
+    from jeepney import DBusAddress, HeaderFields, MatchRule, Properties
+    from jeepney.bus_messages import message_bus
+    from jeepney.io.blocking import open_dbus_connection
+    has_jeepney = True
+except ImportError:
+    has_jeepney = False
+
+MPRIS_PREFIX = "org.mpris.MediaPlayer2."
+MPRIS_PATH = "/org/mpris/MediaPlayer2"
+PLAYER_INTERFACE = "org.mpris.MediaPlayer2.Player"
+
+STATUS_PLAYING = "Playing"
+STATUS_PAUSED = "Paused"
+STATUS_STOPPED = "Stopped"
+
+
+def _unwrap(value):
+    # jeepney把variant表示为 (签名, 值)
+    if isinstance(value, tuple) and len(value) == 2 and isinstance(value[0], str):
+        return value[1]
+    return value
+
+
+def parse_metadata(metadata):
+    """
+    从MPRIS的Metadata中取出 (歌曲名, 艺术家)，艺术家有多个时用/连接
+    """
+    metadata = _unwrap(metadata) or {}
+    title = _unwrap(metadata.get("xesam:title")) or None
+    artists = _unwrap(metadata.get("xesam:artist")) or []
+    if isinstance(artists, str):
+        artists = [artists]
+    artist = "/".join(a for a in artists if a) or None
+    return title, artist
+
+
+def parse_art_url(metadata):
+    """
+    从MPRIS的Metadata中取出专辑封面地址（mpris:artUrl），没有时返回None
+    """
+    metadata = _unwrap(metadata) or {}
+    return _unwrap(metadata.get("mpris:artUrl")) or None
+
+
+class MprisPlayerState:
+    """
+    单个MPRIS播放器的最新状态
+    """
+
+    def __init__(self, bus_name):
+        self.bus_name = bus_name
+        self.title = None
+        self.artist = None
+        self.art_url = None
+        self.status = STATUS_STOPPED
+        self.updated = 0.0
+
+    def apply(self, properties):
+        """
+        应用Player接口的属性（GetAll的结果或PropertiesChanged的变化部分）
+        """
+        if "Metadata" in properties:
+            self.title, self.artist = parse_metadata(properties["Metadata"])
+            self.art_url = parse_art_url(properties["Metadata"])
+        if "PlaybackStatus" in properties:
+            self.status = _unwrap(properties["PlaybackStatus"])
+        self.updated = time.monotonic()
+
+
+class MprisMusicSource:
+    """
+    MPRIS音乐来源
+
+    后台线程持有一个会话总线连接，启动时读取一次所有播放器的状态，
+    之后只处理PropertiesChanged和NameOwnerChanged信号，不做任何轮询；
+    get_current_playing_music只读取内存中的状态，可以在任意线程频繁调用
+    """
+
+    # 接收信号的超时时间（秒），用于及时响应stop
+    RECEIVE_TIMEOUT = 1.0
+    # 本地过滤队列的长度，处理前最多缓存的信号数
+    QUEUE_SIZE = 64
+    # 等待连接总线并读取初始状态的时间（秒）
+    START_TIMEOUT = 2.0
+
+    def __init__(self, bus="SESSION"):
+        self.bus = bus
+        self.players = {}  # 唯一连接名 -> MprisPlayerState
+        self.listeners = []
+        self.running = False
+        self.connected = False
+        self.thread = None
+        self.current = (None, None)
+        self.current_art_url = None
+        self._lock = threading.Lock()
+        self._started = threading.Event()
+        self._ok = False
+
+    def subscribe(self, callback):
+        """
+        订阅当前歌曲变化，回调参数为 (歌曲名, 艺术家)，在监听线程中执行
+        """
+        if callback not in self.listeners:
+            self.listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def start(self):
+        """
+        启动监听线程，等待连接总线并读取初始状态；没有jeepney或连接失败时返回False
+        """
+        if not has_jeepney:
+            return False
+        if self.thread is not None:
+            return self._ok
+        self._ok = False
+        self._started.clear()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="MprisListener", daemon=True)
+        self.thread.start()
+        self._started.wait(self.START_TIMEOUT)
+        if not self._ok:
+            self.stop()
+        return self._ok
+
+    def stop(self):
+        self.running = False
+        thread = self.thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(self.RECEIVE_TIMEOUT * 2)
+        self.thread = None
+
+    def get_current_playing_music(self):
+        """
+        返回正在播放的 (歌曲名, 艺术家)，没有播放时返回 (None, None)
+        """
+        with self._lock:
+            return self.current
+
+    def get_current_art_url(self):
+        """
+        返回正在播放的 (歌曲名, 艺术家, 专辑封面地址)，没有播放时返回 (None, None, None)
+        """
+        with self._lock:
+            return self.current + (self.current_art_url,)
+
+    def _choose_current(self):
+        # 优先选择正在播放的播放器，多个同时播放时选择最近变化的
+        playing = [state for state in self.players.values() if state.status == STATUS_PLAYING and state.title]
+        if not playing:
+            return None
+        return max(playing, key=lambda s: s.updated)
+
+    def _update_current(self):
+        state = self._choose_current()
+        if state is None:
+            self._set_current((None, None), None)
+        else:
+            self._set_current((state.title, state.artist), state.art_url)
+
+    def _set_current(self, current, art_url):
+        with self._lock:
+            # 封面地址可能晚于标题到达，只更新地址时不通知订阅者
+            self.current_art_url = art_url
+            if current == self.current:
+                return
+            self.current = current
+        for listener in list(self.listeners):
+            try:
+                listener(*current)
+            except Exception:
+                pass
+
+    def _load_player(self, connection, bus_name, unique_name):
+        address = DBusAddress(MPRIS_PATH, bus_name=bus_name, interface=PLAYER_INTERFACE)
+        try:
+            reply = connection.send_and_get_reply(Properties(address).get_all())
+        except Exception:
+            return
+        state = MprisPlayerState(bus_name)
+        state.apply(reply.body[0])
+        self.players[unique_name] = state
+
+    def _load_all_players(self, connection):
+        names = connection.send_and_get_reply(message_bus.ListNames()).body[0]
+        for name in names:
+            if not name.startswith(MPRIS_PREFIX):
+                continue
+            try:
+                owner = connection.send_and_get_reply(message_bus.GetNameOwner(name)).body[0]
+            except Exception:
+                continue
+            self._load_player(connection, name, owner)
+
+    def _on_properties_changed(self, message):
+        interface, changed, _ = message.body
+        if interface != PLAYER_INTERFACE:
+            return
+        sender = message.header.fields.get(HeaderFields.sender)
+        state = self.players.get(sender)
+        if state is None:
+            # 信号先于NameOwnerChanged到达，按唯一连接名记录
+            state = self.players[sender] = MprisPlayerState(sender)
+        state.apply(changed)
+        self._update_current()
+
+    def _on_name_owner_changed(self, connection, message):
+        name, old_owner, new_owner = message.body
+        if not name.startswith(MPRIS_PREFIX):
+            return
+        if old_owner:
+            self.players.pop(old_owner, None)
+        if new_owner:
+            self._load_player(connection, name, new_owner)
+        self._update_current()
+
+    def _run(self):
+        try:
+            connection = open_dbus_connection(bus=self.bus)
+        except Exception as e:
+            print(f"连接D-Bus会话总线失败，无法获取MPRIS播放信息: {e}")
+            self.running = False
+            self._started.set()
+            return
+
+        properties_rule = MatchRule(
+            type="signal",
+            interface="org.freedesktop.DBus.Properties",
+            member="PropertiesChanged",
+            path=MPRIS_PATH
+        )
+        properties_rule.add_arg_condition(0, PLAYER_INTERFACE)
+        owner_rule = MatchRule(
+            type="signal",
+            sender="org.freedesktop.DBus",
+            interface="org.freedesktop.DBus",
+            member="NameOwnerChanged"
+        )
+        owner_rule.add_arg_condition(0, "org.mpris.MediaPlayer2", kind="namespace")
+
+        try:
+            with connection, ExitStack() as stack:
+                # 先注册本地过滤队列和总线上的匹配规则，再读取初始状态，避免漏掉中间的变化
+                properties_queue = stack.enter_context(connection.filter(properties_rule, bufsize=self.QUEUE_SIZE))
+                owner_queue = stack.enter_context(connection.filter(owner_rule, bufsize=self.QUEUE_SIZE))
+                connection.send_and_get_reply(message_bus.AddMatch(properties_rule))
+                connection.send_and_get_reply(message_bus.AddMatch(owner_rule))
+
+                self._load_all_players(connection)
+                self.connected = True
+                self._update_current()
+                self._ok = True
+                self._started.set()
+
+                while self.running:
+                    while properties_queue:
+                        self._on_properties_changed(properties_queue.popleft())
+                    while owner_queue:
+                        self._on_name_owner_changed(connection, owner_queue.popleft())
+                    try:
+                        connection.recv_messages(timeout=self.RECEIVE_TIMEOUT)
+                    except TimeoutError:
+                        continue
+        except Exception as e:
+            print(f"MPRIS监听已停止: {e}")
+        finally:
+            self.connected = False
+            self.running = False
+            self._started.set()
+            # 监听停止后状态不再更新，不能继续显示最后一首歌
+            self.players.clear()
+            self._set_current((None, None), None)
+
+
+def create_default_source():
+    """
+    在Linux上创建MPRIS音乐来源，不支持的平台或没有jeepney时返回None
+    """
+    if not sys.platform.startswith("linux") or not has_jeepney:
+        return None
+    return MprisMusicSource()
@@ -4,63 +4,268 @@
 音乐获取工具模块，支持多种音乐播放器
 """
 
-import win32gui
-import win32process
-import psutil
-import re
+# win32模块只在Windows上可用，其他平台可以通过use_window_backend注入模拟后端
+try:
+    import win32gui
+    import win32process
+    has_win32 = True
+except ImportError:
+    has_win32 = False
+
+from process_cache import PidInfoCache, ProcessTable
+from title_parser import ARTIST_SONG, SONG_ARTIST, TitleParser
 
 # 支持的音乐播放器列表
+# title_format 描述窗口标题格式：分隔符、字段顺序、需要去除的后缀和空闲时的标题
 SUPPORTED_PLAYERS = {
     "QQ音乐": {
         "process_name": "QQMusic.exe",
-        "window_class": "OrpheusBrowserHost"
+        "window_class": "OrpheusBrowserHost",
+        "title_format": {
+            "separators": [" - "],
+            "field_order": SONG_ARTIST,
+            "strip_suffixes": [" - QQ音乐"],
+            "idle_titles": ["QQ音乐 听我想听"]
+        }
     },
     "酷我音乐": {
         "process_name": "KuwoMusic.exe",
-        "window_class": "kwplayer_main_window"
+        "window_class": "kwplayer_main_window",
+        "title_format": {
+            "separators": [" - ", "-"],
+            "field_order": SONG_ARTIST,
+            "strip_suffixes": ["-酷我音乐", " - 酷我音乐"],
+            "idle_titles": []
+        }
     },
     "网易云音乐": {
         "process_name": "cloudmusic.exe",
-        "window_class": "OrpheusBrowserHost"
+        "window_class": "OrpheusBrowserHost",
+        "title_format": {
+            "separators": [" - "],
+            "field_order": SONG_ARTIST,
+            "strip_suffixes": [" - 网易云音乐"],
+            "idle_titles": []
+        }
     },
     "汽水音乐": {
         "process_name": "QSMusic.exe",
-        "window_class": "QSMainWindowClass"
+        "window_class": "QSMainWindowClass",
+        "title_format": {
+            "separators": [" - "],
+            "field_order": SONG_ARTIST,
+            "strip_suffixes": [" - 汽水音乐"],
+            "idle_titles": []
+        }
     },
     "Spotify": {
         "process_name": "Spotify.exe",
-        "window_class": "Chrome_WidgetWin_0"
+        "window_class": "Chrome_WidgetWin_0",
+        "title_format": {
+            "separators": [" - "],
+            "field_order": ARTIST_SONG,
+            "strip_suffixes": [],
+            "idle_titles": ["Spotify Premium", "Spotify Free"]
+        }
     },
     "Windows Media Player": {
         "process_name": "wmplayer.exe",
-        "window_class": "WMPlayerApp"
+        "window_class": "WMPlayerApp",
+        "title_format": {
+            "separators": [" - "],
+            "field_order": SONG_ARTIST,
+            "strip_suffixes": [" - Windows Media Player"],
+            "idle_titles": []
+        }
     }
 }
 
+# 进程名到播放器名称的反向索引
+PROCESS_NAME_TO_PLAYERS = {}
+for _player_name, _player_info in SUPPORTED_PLAYERS.items():
+    PROCESS_NAME_TO_PLAYERS.setdefault(_player_info["process_name"], []).append(_player_name)
+
+# 增量维护的进程表，只记录命中播放器进程名的进程
+_process_table = ProcessTable(PROCESS_NAME_TO_PLAYERS)
+
+# 按播放器编译好的标题解析器，解析结果会被缓存
+_title_parser = TitleParser(SUPPORTED_PLAYERS)
+
+# 窗口所属进程的进程名缓存，供前台窗口和窗口枚举共用
+_pid_cache = PidInfoCache()
+
+def get_pid_cache_stats():
+    """
+    获取进程名缓存的命中统计
+    """
+    return _pid_cache.stats()
+
+class Win32WindowBackend:
+    """
+    基于win32gui的窗口后端，进程名通过进程名缓存和进程表查询
+    """
+    
+    def get_foreground_window(self):
+        return win32gui.GetForegroundWindow()
+    
+    def get_window_text(self, hwnd):
+        return win32gui.GetWindowText(hwnd)
+    
+    def get_class_name(self, hwnd):
+        return win32gui.GetClassName(hwnd)
+    
+    def get_window_pid(self, hwnd):
+        _, pid = win32process.GetWindowThreadProcessId(hwnd)
+        return pid
+    
+    def is_window(self, hwnd):
+        # 只检查句柄是否仍然有效且可见，不需要枚举窗口
+        return bool(win32gui.IsWindow(hwnd)) and bool(win32gui.IsWindowVisible(hwnd))
+    
+    def player_pids(self):
+        # 进程表中命中播放器进程名的进程ID
+        return {pid for pid, _ in _process_table.matches}
+    
+    def visible_windows(self):
+        """
+        按枚举顺序返回所有可见窗口的 (窗口句柄, 进程ID)
+        """
+        windows = []
+        
+        def enum_windows_callback(hwnd, _):
+            if win32gui.IsWindowVisible(hwnd):
+                _, pid = win32process.GetWindowThreadProcessId(hwnd)
+                windows.append((hwnd, pid))
+            return True
+        
+        win32gui.EnumWindows(enum_windows_callback, None)
+        return windows
+    
+    def get_process_name(self, pid):
+        # 每个进程只查询一次进程名，并通过缓存跨轮询复用
+        return _pid_cache.get_name(pid)
+    
+    def running_players(self):
+        # 增量刷新进程表，只解析新出现的进程
+        _process_table.refresh()
+        return _process_table.matched_keys()
+
+class FakeWindowBackend:
+    """
+    模拟窗口后端，用于测试和基准测试，不依赖win32
+    """
+    
+    def __init__(self):
+        # 窗口句柄 -> {"pid", "process_name", "class_name", "title", "visible"}，保持添加顺序
+        self.windows = {}
+        # 进程ID -> 进程名
+        self.process_names = {}
+        self.foreground = 0
+    
+    def add_window(self, hwnd, pid, process_name, class_name="", title="", visible=True):
+        self.windows[hwnd] = {
+            "pid": pid,
+            "process_name": process_name,
+            "class_name": class_name,
+            "title": title,
+            "visible": visible
+        }
+        self.process_names[pid] = process_name
+    
+    def remove_window(self, hwnd):
+        self.windows.pop(hwnd, None)
+    
+    def set_title(self, hwnd, title):
+        self.windows[hwnd]["title"] = title
+    
+    def set_foreground(self, hwnd):
+        self.foreground = hwnd
+    
+    def get_foreground_window(self):
+        return self.foreground
+    
+    def get_window_text(self, hwnd):
+        window = self.windows.get(hwnd)
+        return window["title"] if window else ""
+    
+    def get_class_name(self, hwnd):
+        window = self.windows.get(hwnd)
+        return window["class_name"] if window else ""
+    
+    def get_window_pid(self, hwnd):
+        window = self.windows.get(hwnd)
+        return window["pid"] if window else 0
+    
+    def is_window(self, hwnd):
+        window = self.windows.get(hwnd)
+        return bool(window and window["visible"])
+    
+    def player_pids(self):
+        return {pid for pid, process_name in self.process_names.items() if process_name in PROCESS_NAME_TO_PLAYERS}
+    
+    def visible_windows(self):
+        return [(hwnd, window["pid"]) for hwnd, window in self.windows.items() if window["visible"]]
+    
+    def get_process_name(self, pid):
+        return self.process_names.get(pid)
+    
+    def running_players(self):
+        found = set()
+        for process_name in self.process_names.values():
+            found.update(PROCESS_NAME_TO_PLAYERS.get(process_name, ()))
+        return found
+
+# 当前使用的窗口后端，没有win32模块时为None
+_window_backend = Win32WindowBackend() if has_win32 else None
+
+def use_window_backend(backend):
+    """
+    替换窗口后端，例如在测试或基准测试中使用FakeWindowBackend
+    """
+    global _window_backend
+    _window_backend = backend
+
+# 推送式的音乐来源（例如Linux上的MPRIS），设置后优先于窗口标题使用
+_music_source = None
+
+def use_music_source(source):
+    """
+    设置推送式的音乐来源，来源需要提供get_current_playing_music()，传入None恢复使用窗口标题
+    """
+    global _music_source
+    _music_source = source
+
+def has_music_source():
+    """
+    是否设置了推送式的音乐来源
+    """
+    return _music_source is not None
+
 def get_active_window_info():
     """
     获取当前活动窗口的信息
     """
+    backend = _window_backend
+    if backend is None:
+        return None
     try:
-        hwnd = win32gui.GetForegroundWindow()
-        window_text = win32gui.GetWindowText(hwnd)
-        class_name = win32gui.GetClassName(hwnd)
+        hwnd = backend.get_foreground_window()
+        window_text = backend.get_window_text(hwnd)
+        class_name = backend.get_class_name(hwnd)
         
         # 获取进程ID
-        _, pid = win32process.GetWindowThreadProcessId(hwnd)
+        pid = backend.get_window_pid(hwnd)
         
-        try:
-            process = psutil.Process(pid)
-            process_name = process.name()
-            return {
-                "hwnd": hwnd,
-                "window_text": window_text,
-                "class_name": class_name,
-                "pid": pid,
-                "process_name": process_name
-            }
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
+        process_name = backend.get_process_name(pid)
+        if process_name is None:
             return None
+        return {
+            "hwnd": hwnd,
+            "window_text": window_text,
+            "class_name": class_name,
+            "pid": pid,
+            "process_name": process_name
+        }
     except Exception:
         return None
 
@@ -71,74 +276,151 @@ def extract_music_info_from_window_title(title, player_name):
     if not title:
         return None, None
     
-    # 去除播放器名称
-    title = title.replace(player_name, "").strip()
-    
-    # 处理常见的音乐信息格式
-    # 格式1: 歌曲名 - 艺术家
-    match = re.match(r"^(.*?)\s+-\s+(.*?)$", title)
-    if match:
-        return match.group(1).strip(), match.group(2).strip()
-    
-    # 格式2: 艺术家 - 歌曲名
-    match = re.match(r"^(.*?)\s+-\s+(.*?)$", title)
-    if match:
-        return match.group(2).strip(), match.group(1).strip()
+    # 按播放器的标题格式解析，相同标题直接返回缓存结果
+    return _title_parser.parse(player_name, title)
+
+def get_player_for_window(process_name, class_name):
+    """
+    根据进程名返回对应的支持的播放器名称，不是播放器时返回None
+    只有进程名未知时才按窗口类名判断；多个播放器共用同一个类名（如OrpheusBrowserHost）时无法区分，返回None
+    """
+    if process_name is not None:
+        player_names = PROCESS_NAME_TO_PLAYERS.get(process_name)
+        return player_names[0] if player_names else None
     
-    # 如果没有匹配的格式，返回整个标题作为歌曲名
-    return title.strip(), ""
+    matched = [player_name for player_name, player_info in SUPPORTED_PLAYERS.items()
+               if class_name == player_info["window_class"]]
+    return matched[0] if len(matched) == 1 else None
+
+def get_foreground_player():
+    """
+    获取前台窗口所属的播放器名称，前台窗口不是播放器时返回None
+    """
+    window_info = get_active_window_info()
+    if not window_info:
+        return None
+    return get_player_for_window(window_info["process_name"], window_info["class_name"])
+
+def get_window_title_if_alive(player_name, hwnd):
+    """
+    检查之前解析到的播放器窗口是否仍然有效，有效时返回窗口标题，否则返回None
+    窗口句柄可能被系统回收给其他进程，所以同时检查窗口所属进程是否仍是该播放器
+    """
+    backend = _window_backend
+    if backend is None or player_name not in SUPPORTED_PLAYERS:
+        return None
+    try:
+        if not backend.is_window(hwnd):
+            return None
+        process_name = backend.get_process_name(backend.get_window_pid(hwnd))
+        if player_name not in PROCESS_NAME_TO_PLAYERS.get(process_name, ()):
+            return None
+        return backend.get_window_text(hwnd)
+    except Exception:
+        return None
 
 def get_current_playing_music():
     """
     获取当前正在播放的音乐信息
     """
+    if _music_source is not None:
+        return _music_source.get_current_playing_music()
+    
     try:
         window_info = get_active_window_info()
         if not window_info:
             return None, None
         
-        window_text = window_info["window_text"]
-        process_name = window_info["process_name"]
-        class_name = window_info["class_name"]
-        
-        # 检查是否是支持的播放器
-        for player_name, player_info in SUPPORTED_PLAYERS.items():
-            if process_name == player_info["process_name"] or class_name == player_info["window_class"]:
-                # 从窗口标题中提取音乐信息
-                song, artist = extract_music_info_from_window_title(window_text, player_name)
-                
-                # 检查是否是有效的音乐信息（过滤空标题或只包含播放器名称的标题）
-                if song and song != player_name:
-                    return song, artist
+        # 先按进程名确定播放器，再用该播放器的标题格式解析（空闲标题会被过滤）；
+        # 只按窗口类名匹配会把同类名的其他程序（如Chrome_WidgetWin_0）或其他播放器的标题当作歌曲
+        player_name = get_player_for_window(window_info["process_name"], window_info["class_name"])
+        if player_name is None:
+            return None, None
         
+        song, artist = extract_music_info_from_window_title(window_info["window_text"], player_name)
+        if song and song != player_name:
+            return song, artist
         return None, None
     except Exception:
         return None, None
 
+def get_window_pid(hwnd):
+    """
+    获取窗口所属的进程ID，无法获取时返回None
+    """
+    backend = _window_backend
+    if backend is None:
+        return None
+    try:
+        return backend.get_window_pid(hwnd)
+    except Exception:
+        return None
+
+def get_player_pids():
+    """
+    获取所有正在运行的支持的播放器的进程ID，使用最近一次刷新的进程表
+    """
+    if _window_backend is None:
+        return set()
+    try:
+        return set(_window_backend.player_pids())
+    except Exception:
+        return set()
+
 def get_all_running_players():
     """
     获取所有正在运行的支持的音乐播放器
     """
-    running_players = []
-    
+    if _window_backend is None:
+        return []
     try:
-        # 获取所有运行的进程
-        processes = psutil.process_iter()
+        return list(_window_backend.running_players())
+    except Exception:
+        return list(_process_table.matched_keys())
+
+def get_player_windows_snapshot():
+    """
+    枚举一次所有窗口，同时解析所有支持的播放器的窗口句柄和标题
+    返回 {播放器名称: {"hwnd": 窗口句柄, "title": 窗口标题}}
+    """
+    backend = _window_backend
+    if backend is None:
+        return {}
+    
+    # 按进程ID分组可见窗口，保持枚举顺序
+    hwnds_by_pid = {}
+    for hwnd, pid in backend.visible_windows():
+        hwnds_by_pid.setdefault(pid, []).append(hwnd)
+    
+    # 每个播放器优先使用窗口类名匹配的窗口，否则使用第一个窗口
+    class_matched = {}
+    first_matched = {}
+    for pid, hwnds in hwnds_by_pid.items():
+        # 每个进程只查询一次进程名
+        process_name = backend.get_process_name(pid)
+        player_names = PROCESS_NAME_TO_PLAYERS.get(process_name)
+        if not player_names:
+            continue
         
-        for process in processes:
-            try:
-                process_name = process.name()
-                
-                # 检查是否是支持的播放器
-                for player_name, player_info in SUPPORTED_PLAYERS.items():
-                    if process_name == player_info["process_name"]:
-                        running_players.append(player_name)
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
+        for player_name in player_names:
+            if player_name in class_matched:
                 continue
-    except Exception:
-        pass
+            target_class = SUPPORTED_PLAYERS[player_name]["window_class"]
+            first_matched.setdefault(player_name, hwnds[0])
+            for hwnd in hwnds:
+                if backend.get_class_name(hwnd) == target_class:
+                    class_matched[player_name] = hwnd
+                    break
+    
+    snapshot = {}
+    for player_name, hwnd in first_matched.items():
+        hwnd = class_matched.get(player_name, hwnd)
+        snapshot[player_name] = {
+            "hwnd": hwnd,
+            "title": backend.get_window_text(hwnd)
+        }
     
-    return list(set(running_players))
+    return snapshot
 
 def get_player_window_by_name(player_name):
     """
@@ -147,30 +429,25 @@ def get_player_window_by_name(player_name):
     if player_name not in SUPPORTED_PLAYERS:
         return None
     
-    player_info = SUPPORTED_PLAYERS[player_name]
-    target_process = player_info["process_name"]
-    target_class = player_info["window_class"]
-    
-    hwnds = []
-    
-    def enum_windows_callback(hwnd, _):
-        if win32gui.IsWindowVisible(hwnd):
-            try:
-                _, pid = win32process.GetWindowThreadProcessId(hwnd)
-                process = psutil.Process(pid)
-                if process.name() == target_process:
-                    hwnds.append(hwnd)
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass
-        return True
-    
-    win32gui.EnumWindows(enum_windows_callback, None)
+    entry = get_player_windows_snapshot().get(player_name)
+    return entry["hwnd"] if entry else None
+
+def get_music_from_all_players(snapshot=None):
+    """
+    从一次窗口快照中获取所有播放器当前播放的音乐
+    返回 {播放器名称: (歌曲名, 艺术家)}，按SUPPORTED_PLAYERS的顺序排列
+    """
+    if snapshot is None:
+        snapshot = get_player_windows_snapshot()
     
-    for hwnd in hwnds:
-        if win32gui.GetClassName(hwnd) == target_class:
-            return hwnd
+    results = {}
+    for player_name in SUPPORTED_PLAYERS:
+        entry = snapshot.get(player_name)
+        if not entry or not entry["title"]:
+            continue
+        results[player_name] = extract_music_info_from_window_title(entry["title"], player_name)
     
-    return hwnds[0] if hwnds else None
+    return results
 
 def get_music_from_specific_player(player_name):
     """
@@ -179,12 +456,4 @@ def get_music_from_specific_player(player_name):
     if player_name not in SUPPORTED_PLAYERS:
         return None, None
     
-    hwnd = get_player_window_by_name(player_name)
-    if not hwnd:
-        return None, None
-    
-    window_text = win32gui.GetWindowText(hwnd)
-    if not window_text:
-        return None, None
-    
-    return extract_music_info_from_window_title(window_text, player_name)
+    return get_music_from_all_players().get(player_name, (None, None))
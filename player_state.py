@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+播放器状态模块，按播放器分别跟踪窗口和标题，标题稳定一段时间后才更新显示
+"""
+
+import time
+
+import music_utils
+
+
+class PlayerTrack:
+    """
+    单个播放器的跟踪状态
+    """
+
+    def __init__(self, player_name):
+        self.player_name = player_name
+        # 固定的窗口句柄，失效后才重新枚举窗口
+        self.hwnd = None
+        self.title = None
+        # 上次枚举窗口的时间，没有找到窗口（例如最小化到托盘）时不会每次轮询都重新枚举
+        self.resolved_at = None
+        # 最近观察到的 (歌曲名, 艺术家)，以及开始观察到它的时间
+        self.candidate = None
+        self.candidate_since = 0.0
+        # 已经稳定、对外显示的 (歌曲名, 艺术家)，None表示没有播放
+        self.committed = None
+        self.committed_at = 0.0
+        self.observed = False
+
+
+class PlayerStateStore:
+    """
+    播放器状态存储
+
+    每个播放器的窗口句柄被固定下来，之后每次轮询只检查窗口是否还存在并读取标题，
+    窗口失效或有新播放器启动时才重新枚举所有窗口；
+    标题变化后要在stable_window秒内保持不变才会生效，焦点切换和短暂的标题不会造成闪烁
+    """
+
+    def __init__(self, stable_window=1.0, clock=time.monotonic):
+        self.stable_window = stable_window
+        self.clock = clock
+        self.tracks = {}  # 播放器名称 -> PlayerTrack
+        # 统计：窗口枚举次数和固定窗口直接命中的次数
+        self.enumerations = 0
+        self.pinned_hits = 0
+        # 固定的窗口句柄和播放器进程ID，供事件线程过滤标题事件，每次轮询后整体替换
+        self.watched_hwnds = frozenset()
+        self.watched_pids = frozenset()
+
+    def _refresh_windows(self, running, now):
+        # 检查固定的窗口，失效的窗口和新启动的播放器需要重新枚举
+        need_enumeration = False
+        for player_name in running:
+            track = self.tracks.get(player_name)
+            if track is None:
+                track = self.tracks[player_name] = PlayerTrack(player_name)
+            if track.hwnd is not None:
+                title = music_utils.get_window_title_if_alive(player_name, track.hwnd)
+                if title is not None:
+                    track.title = title
+                    self.pinned_hits += 1
+                    continue
+                track.hwnd = None
+                track.resolved_at = None
+            if track.resolved_at is None or now - track.resolved_at >= self.stable_window:
+                need_enumeration = True
+
+        if need_enumeration:
+            self.enumerations += 1
+            snapshot = music_utils.get_player_windows_snapshot()
+            for player_name in running:
+                track = self.tracks[player_name]
+                if track.hwnd is not None:
+                    continue
+                entry = snapshot.get(player_name)
+                track.resolved_at = now
+                track.hwnd = entry["hwnd"] if entry else None
+                track.title = entry["title"] if entry else None
+
+    def _observe(self, track, now):
+        song = artist = None
+        if track.title:
+            song, artist = music_utils.extract_music_info_from_window_title(track.title, track.player_name)
+        value = (song, artist) if song and song != track.player_name else None
+
+        if not track.observed:
+            # 第一次观察到的播放器直接生效，启动时不需要等待
+            track.observed = True
+            track.candidate = track.committed = value
+            track.candidate_since = track.committed_at = now
+            return
+
+        if value != track.candidate:
+            track.candidate = value
+            track.candidate_since = now
+        if track.candidate != track.committed and now - track.candidate_since >= self.stable_window:
+            track.committed = track.candidate
+            track.committed_at = now
+
+    def poll(self):
+        """
+        更新所有播放器的状态，返回当前应显示的 (歌曲名, 艺术家)，没有播放时返回 (None, None)
+        """
+        now = self.clock()
+        running = set(music_utils.get_all_running_players())
+
+        # 退出的播放器不再跟踪
+        for player_name in list(self.tracks):
+            if player_name not in running:
+                del self.tracks[player_name]
+
+        self._refresh_windows(running, now)
+        for track in self.tracks.values():
+            self._observe(track, now)
+        self.watched_hwnds = frozenset(track.hwnd for track in self.tracks.values() if track.hwnd is not None)
+        self.watched_pids = frozenset(music_utils.get_player_pids())
+
+        return self.current(music_utils.get_foreground_player())
+
+    def current(self, foreground_player=None):
+        """
+        返回当前应显示的歌曲：前台播放器优先，否则使用最近一次变化的播放器
+        """
+        track = self.tracks.get(foreground_player)
+        if track is not None and track.committed is not None:
+            return track.committed
+
+        playing = [track for track in self.tracks.values() if track.committed is not None]
+        if not playing:
+            return None, None
+        return max(playing, key=lambda t: t.committed_at).committed
+
+    def is_tracked_window(self, hwnd):
+        """
+        窗口是否属于正在跟踪的播放器，可在任意线程调用，用于过滤窗口标题事件
+        """
+        if hwnd in self.watched_hwnds:
+            return True
+        return music_utils.get_window_pid(hwnd) in self.watched_pids
+
+    def pending(self):
+        """
+        是否有播放器的标题变化还在等待稳定
+        """
+        return any(track.candidate != track.committed for track in self.tracks.values())
+
+    def stats(self):
+        return {
+            "players": len(self.tracks),
+            "enumerations": self.enumerations,
+            "pinned_hits": self.pinned_hits
+        }
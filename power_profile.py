@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自适应采样模块，根据供电、空闲和锁屏状态调整探针的采样间隔
+"""
+
+import sys
+import threading
+import time
+
+# 采样档位及对应的间隔倍数
+PROFILE_FULL = "full"  # 接通电源且正在使用
+PROFILE_BATTERY = "battery"  # 使用电池供电
+PROFILE_IDLE = "idle"  # 用户长时间没有操作
+PROFILE_LOCKED = "locked"  # 会话已锁定
+
+PROFILE_MULTIPLIERS = {
+    PROFILE_FULL: 1.0,
+    PROFILE_BATTERY: 2.0,
+    PROFILE_IDLE: 4.0,
+    PROFILE_LOCKED: 10.0,
+}
+
+
+def get_idle_seconds():
+    """
+    获取用户最后一次输入距今的秒数，不支持的平台返回0
+    """
+    if sys.platform != "win32":
+        return 0.0
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class LASTINPUTINFO(ctypes.Structure):
+            _fields_ = [("cbSize", wintypes.UINT), ("dwTime", wintypes.DWORD)]
+
+        info = LASTINPUTINFO()
+        info.cbSize = ctypes.sizeof(LASTINPUTINFO)
+        if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+            return 0.0
+        elapsed = (ctypes.windll.kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF
+        return elapsed / 1000.0
+    except Exception:
+        return 0.0
+
+
+def is_session_locked():
+    """
+    判断当前会话是否已锁定，不支持的平台返回False
+    """
+    if sys.platform != "win32":
+        return False
+    try:
+        import ctypes
+
+        user32 = ctypes.windll.user32
+        DESKTOP_SWITCHDESKTOP = 0x0100
+        # 锁屏时输入桌面切换到了安全桌面，无法切换到当前桌面
+        desktop = user32.OpenInputDesktop(0, False, DESKTOP_SWITCHDESKTOP)
+        if not desktop:
+            return True
+        try:
+            return not user32.SwitchDesktop(desktop)
+        finally:
+            user32.CloseDesktop(desktop)
+    except Exception:
+        return False
+
+
+class SamplingPolicy:
+    """
+    自适应采样策略
+
+    使用电池、用户空闲或锁屏时按档位放大探针间隔；
+    用户操作或收到系统事件后立即恢复全速采样，并保持一段时间
+    """
+
+    # 超过该时间没有输入视为空闲（秒）
+    IDLE_THRESHOLD = 120.0
+    # 用户操作或收到事件后保持全速采样的时间（秒）
+    BOOST_DURATION = 30.0
+
+    def __init__(self, base_intervals, idle_seconds=get_idle_seconds, session_locked=is_session_locked):
+        # 探针名称 -> 全速档位的间隔（秒），None表示不定时采样
+        self.base_intervals = dict(base_intervals)
+        self.idle_seconds = idle_seconds
+        self.session_locked = session_locked
+        self.on_battery = False
+        self.boost_until = 0.0
+        self.profile = PROFILE_FULL
+        self._lock = threading.Lock()
+
+    def _choose_profile(self):
+        if time.monotonic() < self.boost_until:
+            return PROFILE_FULL
+        if self.session_locked():
+            return PROFILE_LOCKED
+        if self.idle_seconds() >= self.IDLE_THRESHOLD:
+            return PROFILE_IDLE
+        if self.on_battery:
+            return PROFILE_BATTERY
+        return PROFILE_FULL
+
+    def update(self):
+        """
+        重新评估采样档位，档位变化时返回True
+        """
+        profile = self._choose_profile()
+        with self._lock:
+            changed = profile != self.profile
+            self.profile = profile
+        return changed
+
+    def set_on_battery(self, on_battery):
+        """
+        更新供电状态，档位变化时返回True
+        """
+        self.on_battery = bool(on_battery)
+        return self.update()
+
+    def notify_activity(self):
+        """
+        用户操作或收到系统事件，立即恢复全速采样，档位变化时返回True
+        """
+        with self._lock:
+            self.boost_until = time.monotonic() + self.BOOST_DURATION
+            changed = self.profile != PROFILE_FULL
+            self.profile = PROFILE_FULL
+        return changed
+
+    def set_base_interval(self, name, interval):
+        """
+        修改探针在全速档位下的间隔，间隔变化时返回True
+        """
+        with self._lock:
+            changed = self.base_intervals.get(name) != interval
+            self.base_intervals[name] = interval
+        return changed
+
+    def effective_interval(self, name):
+        """
+        返回探针在当前档位下的实际间隔
+        """
+        with self._lock:
+            interval = self.base_intervals.get(name)
+            if interval is None:
+                return None
+            return interval * PROFILE_MULTIPLIERS[self.profile]
+
+    def effective_intervals(self):
+        """
+        返回所有探针在当前档位下的实际间隔
+        """
+        return {name: self.effective_interval(name) for name in list(self.base_intervals)}
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进程信息缓存模块，避免每次轮询都重新扫描全部进程
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import psutil
+
+
+class ProcessTable:
+    """
+    增量维护的进程表，以 (pid, 创建时间) 标识进程
+
+    每次刷新只解析新出现的PID并丢弃已经退出的PID，
+    命中关注进程名的进程会单独记录，查询时不需要再调用 name()；
+    PID可能在两次刷新之间被复用，命中的进程每次都复核创建时间，
+    其余进程每次轮流复核revalidate_batch个，新进程最迟在几轮刷新后被发现
+    """
+
+    def __init__(self, name_index, revalidate_batch=32):
+        # 进程名 -> 关注该进程名的键列表（例如播放器名称）
+        self.name_index = name_index
+        self.revalidate_batch = revalidate_batch
+        # pid -> (创建时间, 进程名)，无权限读取的进程名为None
+        self.entries = {}
+        # (pid, 创建时间) -> 键列表，只包含命中关注进程名的进程
+        self.matches = {}
+        # 等待轮流复核的PID
+        self._revalidate_queue = []
+
+    def _resolve(self, pid):
+        try:
+            process = psutil.Process(pid)
+            with process.oneshot():
+                create_time = process.create_time()
+                try:
+                    name = process.name()
+                except psutil.AccessDenied:
+                    name = None
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return
+        self.entries[pid] = (create_time, name)
+        keys = self.name_index.get(name)
+        if keys:
+            self.matches[(pid, create_time)] = keys
+
+    def _drop(self, pid):
+        create_time, _ = self.entries.pop(pid)
+        self.matches.pop((pid, create_time), None)
+
+    def _revalidate(self, pid):
+        # 创建时间变化说明PID已被新进程复用，重新解析
+        entry = self.entries.get(pid)
+        if entry is None:
+            return
+        try:
+            if psutil.Process(pid).create_time() == entry[0]:
+                return
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            pass
+        self._drop(pid)
+        self._resolve(pid)
+
+    def _revalidate_matches(self):
+        # 关注的进程数量很少，每次都检查
+        for pid, _ in list(self.matches):
+            self._revalidate(pid)
+
+    def _revalidate_others(self):
+        # 其余进程轮流检查，避免每次刷新都访问全部进程
+        if not self._revalidate_queue:
+            self._revalidate_queue = list(self.entries)
+        batch = self._revalidate_queue[-self.revalidate_batch:]
+        del self._revalidate_queue[-self.revalidate_batch:]
+        matched = {pid for pid, _ in self.matches}
+        for pid in batch:
+            if pid not in matched:
+                self._revalidate(pid)
+
+    def refresh(self):
+        """
+        同步进程表，只处理新增和退出的进程
+        """
+        current = set(psutil.pids())
+        known = set(self.entries)
+
+        for pid in known - current:
+            self._drop(pid)
+        for pid in current - known:
+            self._resolve(pid)
+
+        self._revalidate_matches()
+        self._revalidate_others()
+
+    def matched_keys(self):
+        """
+        返回当前命中的所有键（去重）
+        """
+        found = set()
+        for keys in self.matches.values():
+            found.update(keys)
+        return found
+
+    def name_of(self, pid):
+        """
+        返回进程表中记录的进程名，未知时返回None
+        """
+        entry = self.entries.get(pid)
+        return entry[1] if entry else None
+
+
+class PidInfoCache:
+    """
+    PID到进程名的LRU缓存，超出容量时淘汰最久未使用的记录
+
+    记录超过复核间隔后会重新读取进程创建时间，
+    创建时间变化说明PID已被新进程复用，此时重新读取进程名
+    """
+
+    def __init__(self, maxsize=256, revalidate_interval=2.0):
+        self.maxsize = maxsize
+        self.revalidate_interval = revalidate_interval
+        # pid -> [创建时间, 进程名, 上次复核时间]
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_name(self, pid):
+        """
+        获取进程名，进程不存在或无权限时返回None
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(pid)
+            if entry is not None and now - entry[2] < self.revalidate_interval:
+                self._entries.move_to_end(pid)
+                self.hits += 1
+                return entry[1]
+
+        try:
+            process = psutil.Process(pid)
+            with process.oneshot():
+                create_time = process.create_time()
+                if entry is not None and entry[0] == create_time:
+                    name = entry[1]
+                    cached = True
+                else:
+                    name = process.name()
+                    cached = False
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            with self._lock:
+                self._entries.pop(pid, None)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            if cached:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self._entries[pid] = [create_time, name, now]
+            self._entries.move_to_end(pid)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return name
+
+    def invalidate(self, pid=None):
+        """
+        删除指定PID的记录，不指定时清空缓存
+        """
+        with self._lock:
+            if pid is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(pid, None)
+
+    def stats(self):
+        """
+        返回缓存命中统计
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "hit_rate": self.hits / total if total else 0.0
+            }
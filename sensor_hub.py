@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+传感器中心模块，在一个后台线程中按各自的间隔运行所有采样探针
+"""
+
+import threading
+import time
+from collections import deque
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from timer_wheel import TimerWheel
+
+# 探针尚未产生数据时的占位值
+_UNSET = object()
+
+
+class SensorProbe:
+    """
+    采样探针：名称和采样函数，调度由定时轮负责
+    """
+
+    def __init__(self, name, read):
+        self.name = name
+        self.read = read
+        self.last_value = _UNSET
+
+
+class SensorHub(QThread):
+    """
+    传感器中心，统一调度所有探针，只把变化的字段批量发送给界面
+
+    周期探针和时钟探针共用一个定时轮，间隔互为倍数的探针会在同一次唤醒中执行
+    """
+
+    sensors_updated = pyqtSignal(dict)  # 信号：发送 {探针名称: 新值}，只包含变化的字段
+
+    # 单次休眠的上限（秒），在收不到休眠唤醒通知的平台上也能发现时钟跳变
+    MAX_SLEEP = 30.0
+
+    def __init__(self):
+        super().__init__()
+        self.running = True
+        self.probes = {}
+        self.condition = threading.Condition()
+        self.wheel = TimerWheel()
+        # 最近一分钟内的唤醒时间
+        self.wakeup_times = deque()
+
+    def add_probe(self, name, read, interval):
+        """
+        添加周期探针，interval为None时只在被唤醒或推送时更新
+        """
+        with self.condition:
+            self.probes[name] = SensorProbe(name, read)
+            self.wheel.add_periodic(name, interval)
+            self.condition.notify()
+
+    def add_clock_probe(self, name, read, boundary=60.0):
+        """
+        添加时钟探针，在本地时间的每个boundary整数倍（如整分钟）执行
+        """
+        with self.condition:
+            self.probes[name] = SensorProbe(name, read)
+            self.wheel.add_clock(name, boundary)
+            self.condition.notify()
+
+    def set_interval(self, name, interval):
+        """
+        修改探针的采样间隔
+        """
+        with self.condition:
+            self.wheel.set_interval(name, interval)
+            self.condition.notify()
+
+    def wake(self, name, delay=0.0):
+        """
+        让探针在delay秒后执行一次，可在任意线程调用
+        多次唤醒会合并为一次执行
+        """
+        with self.condition:
+            self.wheel.trigger(name, delay)
+            self.condition.notify()
+
+    def resync(self):
+        """
+        休眠唤醒或系统时间变化后重新对齐时钟探针，可在任意线程调用
+        """
+        with self.condition:
+            self.wheel.resync()
+            self.condition.notify()
+
+    def push(self, name, value):
+        """
+        直接推送探针的新值（例如系统回调），值变化时发送信号，可在任意线程调用
+        """
+        with self.condition:
+            probe = self.probes.get(name)
+            if probe is None or value == probe.last_value:
+                return
+            probe.last_value = value
+        self.sensors_updated.emit({name: value})
+
+    def _record_wakeup(self, now):
+        self.wakeup_times.append(now)
+        while self.wakeup_times and now - self.wakeup_times[0] > 60.0:
+            self.wakeup_times.popleft()
+
+    def wakeups_per_minute(self):
+        """
+        返回最近一分钟内的唤醒次数
+        """
+        with self.condition:
+            now = time.monotonic()
+            return sum(1 for t in self.wakeup_times if now - t <= 60.0)
+
+    def run(self):
+        while True:
+            with self.condition:
+                if not self.running:
+                    break
+
+                # 等待最早到期的探针，时钟跳变时时钟探针会立即到期
+                self.wheel.check_clock()
+                now = time.monotonic()
+                next_due = self.wheel.next_deadline()
+                if next_due is None or next_due > now:
+                    timeout = self.MAX_SLEEP if next_due is None else min(next_due - now, self.MAX_SLEEP)
+                    self.condition.wait(timeout)
+                    self._record_wakeup(time.monotonic())
+                    continue
+
+                due = [self.probes[name] for name in self.wheel.pop_due()]
+
+            # 在锁外执行采样，避免阻塞推送和唤醒
+            changes = {}
+            for probe in due:
+                try:
+                    value = probe.read()
+                except Exception:
+                    continue
+                with self.condition:
+                    if value == probe.last_value:
+                        continue
+                    probe.last_value = value
+                changes[probe.name] = value
+
+            if changes:
+                self.sensors_updated.emit(changes)
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
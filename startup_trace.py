@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+启动耗时跟踪模块，记录导入、初始化和首帧绘制等阶段的时间点
+"""
+
+import threading
+import time
+
+
+class StartupTrace:
+    """
+    启动跟踪
+
+    以创建时刻（或对齐后的进程启动时刻）为起点，按名称记录各阶段完成的时间，同名阶段只记录第一次；
+    后台完成的阶段（如音量后端初始化）也可以在任意线程中记录
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.start_wall = time.time()
+        # 进程启动到跟踪起点的毫秒数（解释器启动等），未知时为0
+        self.process_offset = 0.0
+        # [(阶段名称, 距起点的毫秒数)]，按记录顺序排列
+        self.marks = []
+        self._lock = threading.Lock()
+
+    def align_to_process_start(self, create_time):
+        """
+        以进程创建时间（墙上时间戳）为起点，之后的耗时都从进程启动算起
+        """
+        self.process_offset = max(0.0, (self.start_wall - create_time) * 1000.0)
+
+    def mark(self, name):
+        """
+        记录阶段完成的时间
+        """
+        elapsed = (time.perf_counter() - self.start) * 1000.0 + self.process_offset
+        with self._lock:
+            if any(mark_name == name for mark_name, _ in self.marks):
+                return
+            self.marks.append((name, elapsed))
+
+    def has_mark(self, name):
+        with self._lock:
+            return any(mark_name == name for mark_name, _ in self.marks)
+
+    def breakdown(self):
+        """
+        按时间顺序返回 [(阶段名称, 距起点毫秒数, 距上一阶段毫秒数)]
+        """
+        with self._lock:
+            marks = sorted(self.marks, key=lambda mark: mark[1])
+        result = []
+        previous = 0.0
+        if self.process_offset:
+            result.append(("trace_start", self.process_offset, self.process_offset))
+            previous = self.process_offset
+        for name, elapsed in marks:
+            result.append((name, elapsed, elapsed - previous))
+            previous = elapsed
+        return result
+
+    def summary_lines(self):
+        return [f"{name}: {elapsed:.0f} ms (+{delta:.0f} ms)" for name, elapsed, delta in self.breakdown()]
+
+    def to_dict(self):
+        return {name: elapsed for name, elapsed, _ in self.breakdown()}
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+状态快照模块，保存最后一次显示的歌曲、音量、电池和窗口位置，启动时直接显示
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+SNAPSHOT_VERSION = 1
+
+
+def default_snapshot_path():
+    """
+    返回快照文件的默认路径：Windows下位于LOCALAPPDATA，其他平台位于~/.cache
+    """
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "DynamicIsland", "state.json")
+
+
+class StateSnapshot:
+    """
+    最后已知状态的快照
+
+    字段变化时只修改内存中的数据并标记为脏，由调用方在去抖之后调用save；
+    保存时先写临时文件再替换，进程在写入途中退出也不会留下损坏的快照
+    """
+
+    FIELDS = ("song", "artist", "volume", "mute", "battery", "window")
+
+    def __init__(self, path=None):
+        self.path = path or default_snapshot_path()
+        self.data = {}
+        self.dirty = False
+        # 统计：实际写入的次数
+        self.writes = 0
+
+    def load(self):
+        """
+        读取快照，文件不存在、损坏或版本不符时返回空字典
+        """
+        try:
+            with open(self.path, "rb") as f:
+                data = json.loads(f.read().decode("utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+            return {}
+        self.data = {name: data[name] for name in self.FIELDS if name in data}
+        return dict(self.data)
+
+    def update(self, **fields):
+        """
+        更新字段，有字段变化时返回True
+        """
+        changed = False
+        for name, value in fields.items():
+            if isinstance(value, tuple):
+                # JSON中只有列表，统一后再比较，避免读回的快照被误判为变化
+                value = list(value)
+            if self.data.get(name) != value:
+                self.data[name] = value
+                changed = True
+        if changed:
+            self.dirty = True
+        return changed
+
+    def save(self):
+        """
+        有未保存的变化时原子地写入快照，返回是否写入
+        """
+        if not self.dirty:
+            return False
+
+        payload = dict(self.data)
+        payload["version"] = SNAPSHOT_VERSION
+        content = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        directory = os.path.dirname(self.path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix=".state-", suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(content)
+                os.replace(temp_path, self.path)
+            except BaseException:
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+                raise
+        except OSError as e:
+            print(f"保存状态快照失败: {e}")
+            return False
+
+        self.dirty = False
+        self.writes += 1
+        return True
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MprisMusicSource的集成测试，在私有的dbus-daemon上运行一个模拟的MPRIS播放器
+
+没有dbus-daemon可执行文件或没有安装jeepney时跳过
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mpris_music
+
+if mpris_music.has_jeepney:
+    from jeepney import DBusAddress, HeaderFields, MessageType, new_error, new_method_return, new_signal
+    from jeepney.bus_messages import message_bus
+    from jeepney.io.blocking import open_dbus_connection
+
+DBUS_DAEMON = shutil.which("dbus-daemon")
+PLAYER_NAME = mpris_music.MPRIS_PREFIX + "standin"
+# 等待总线启动和信号到达的超时时间（秒）
+TIMEOUT = 10.0
+
+BUS_CONFIG = """<!DOCTYPE busconfig PUBLIC "-//freedesktop//DTD D-Bus Bus Configuration 1.0//EN"
+ "http://www.freedesktop.org/standards/dbus/1.0/busconfig.dtd">
+<busconfig>
+  <type>session</type>
+  <listen>unix:path={socket}</listen>
+  <auth>EXTERNAL</auth>
+  <policy context="default">
+    <allow send_destination="*" eavesdrop="true"/>
+    <allow eavesdrop="true"/>
+    <allow own="*"/>
+  </policy>
+</busconfig>
+"""
+
+
+def metadata(title, artists):
+    return ("a{sv}", {
+        "xesam:title": ("s", title),
+        "xesam:artist": ("as", artists),
+        "mpris:artUrl": ("s", "file:///tmp/cover.png")
+    })
+
+
+class StandInPlayer:
+    """
+    模拟的MPRIS播放器：占用总线名称，响应Properties.GetAll，并发送PropertiesChanged信号
+    """
+
+    def __init__(self, address):
+        self.connection = open_dbus_connection(bus=address)
+        self.properties = {
+            "Metadata": metadata("晴天", ["周杰伦"]),
+            "PlaybackStatus": ("s", mpris_music.STATUS_PLAYING)
+        }
+        self.running = True
+        self.lock = threading.Lock()
+        self.connection.send_and_get_reply(message_bus.RequestName(PLAYER_NAME))
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+        self.thread.start()
+
+    def _serve(self):
+        while self.running:
+            try:
+                message = self.connection.receive(timeout=0.2)
+            except TimeoutError:
+                continue
+            except Exception:
+                break
+            if message.header.message_type != MessageType.method_call:
+                continue
+            member = message.header.fields.get(HeaderFields.member)
+            with self.lock:
+                if member == "GetAll":
+                    reply = new_method_return(message, "a{sv}", (dict(self.properties),))
+                else:
+                    reply = new_error(message, "org.freedesktop.DBus.Error.UnknownMethod")
+                self.connection.send(reply)
+
+    def change(self, **changed):
+        # 修改属性并发送PropertiesChanged信号
+        emitter = DBusAddress(mpris_music.MPRIS_PATH, interface="org.freedesktop.DBus.Properties")
+        with self.lock:
+            self.properties.update(changed)
+            signal = new_signal(emitter, "PropertiesChanged", "sa{sv}as",
+                                (mpris_music.PLAYER_INTERFACE, changed, []))
+            self.connection.send(signal)
+
+    def exit(self):
+        # 关闭连接，总线会发送NameOwnerChanged
+        self.running = False
+        self.thread.join(TIMEOUT)
+        self.connection.close()
+
+
+@unittest.skipUnless(DBUS_DAEMON and mpris_music.has_jeepney, "需要dbus-daemon可执行文件和jeepney")
+class MprisMusicSourceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp(prefix="island-dbus-")
+        self.addCleanup(shutil.rmtree, self.temp_dir, True)
+        socket_path = os.path.join(self.temp_dir, "bus")
+        config_path = os.path.join(self.temp_dir, "bus.conf")
+        with open(config_path, "w", encoding="utf-8") as f:
+            f.write(BUS_CONFIG.format(socket=socket_path))
+
+        self.daemon = subprocess.Popen(
+            [DBUS_DAEMON, "--config-file=" + config_path, "--nofork", "--nopidfile"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        self.addCleanup(self._stop_daemon)
+        deadline = time.monotonic() + TIMEOUT
+        while not os.path.exists(socket_path):
+            if self.daemon.poll() is not None or time.monotonic() > deadline:
+                self.skipTest("dbus-daemon启动失败")
+            time.sleep(0.05)
+        self.address = "unix:path=" + socket_path
+
+        self.player = StandInPlayer(self.address)
+        self.source = mpris_music.MprisMusicSource(bus=self.address)
+        self.updates = []
+        self.updated = threading.Condition()
+        self.source.subscribe(self.on_update)
+        self.assertTrue(self.source.start())
+        self.addCleanup(self.source.stop)
+
+    def _stop_daemon(self):
+        self.daemon.terminate()
+        try:
+            self.daemon.wait(TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.daemon.kill()
+
+    def on_update(self, song, artist):
+        with self.updated:
+            self.updates.append((song, artist))
+            self.updated.notify_all()
+
+    def change(self, **changed):
+        # 只等待这次修改之后的更新
+        with self.updated:
+            self.updates.clear()
+        self.player.change(**changed)
+
+    def wait_for(self, expected):
+        with self.updated:
+            ok = self.updated.wait_for(lambda: expected in self.updates, TIMEOUT)
+        self.assertTrue(ok, f"没有收到 {expected}，收到的更新: {self.updates}")
+        self.assertEqual(self.source.get_current_playing_music(), expected)
+
+    def test_initial_state_and_changes(self):
+        # start返回时已经读取了已有播放器的状态
+        self.assertEqual(self.source.get_current_playing_music(), ("晴天", "周杰伦"))
+        self.wait_for(("晴天", "周杰伦"))
+        self.assertEqual(self.source.get_current_art_url()[2], "file:///tmp/cover.png")
+
+        # 切歌时通过PropertiesChanged推送
+        self.change(Metadata=metadata("后来", ["刘若英"]))
+        self.wait_for(("后来", "刘若英"))
+
+        # 暂停后没有正在播放的歌曲
+        self.change(PlaybackStatus=("s", mpris_music.STATUS_PAUSED))
+        self.wait_for((None, None))
+
+        # 恢复播放后播放器退出，通过NameOwnerChanged移除
+        self.change(PlaybackStatus=("s", mpris_music.STATUS_PLAYING))
+        self.wait_for(("后来", "刘若英"))
+        with self.updated:
+            self.updates.clear()
+        self.player.exit()
+        self.wait_for((None, None))
+        self.assertEqual(self.source.players, {})
+
+    def test_bus_lost_clears_current(self):
+        # 总线断开后监听停止，不能继续显示最后一首歌
+        self.wait_for(("晴天", "周杰伦"))
+        with self.updated:
+            self.updates.clear()
+        self._stop_daemon()
+        self.wait_for((None, None))
+        self.source.thread.join(TIMEOUT)
+        self.assertFalse(self.source.connected)
+
+    def test_start_fails_without_bus(self):
+        source = mpris_music.MprisMusicSource(bus="unix:path=" + os.path.join(self.temp_dir, "missing"))
+        self.assertFalse(source.start())
+        self.assertIsNone(source.thread)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PulseAudioBackend的集成测试，在临时目录中启动一个只有null sink的PulseAudio服务器
+
+没有pulseaudio可执行文件或pulsectl不可用时跳过
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import volume_utils
+
+PULSEAUDIO = shutil.which("pulseaudio")
+SINK_NAME = "island_test_sink"
+# 等待服务器启动和事件推送的超时时间（秒）
+TIMEOUT = 10.0
+
+
+@unittest.skipUnless(PULSEAUDIO and volume_utils.has_pulsectl, "需要pulseaudio可执行文件和pulsectl")
+class PulseAudioBackendTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.runtime_dir = tempfile.mkdtemp(prefix="island-pulse-")
+        socket_path = os.path.join(cls.runtime_dir, "native")
+        env = dict(os.environ, HOME=cls.runtime_dir, XDG_RUNTIME_DIR=cls.runtime_dir,
+                   XDG_CONFIG_HOME=cls.runtime_dir)
+        cls.server = subprocess.Popen(
+            [
+                PULSEAUDIO, "--daemonize=no", "-n", "--exit-idle-time=-1", "--disable-shm",
+                "--use-pid-file=no", "--system=no",
+                "--load=module-native-protocol-unix socket=%s auth-anonymous=1" % socket_path,
+                "--load=module-null-sink sink_name=%s" % SINK_NAME,
+            ],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+
+        cls.saved_server = os.environ.get("PULSE_SERVER")
+        os.environ["PULSE_SERVER"] = "unix:" + socket_path
+        deadline = time.monotonic() + TIMEOUT
+        while not os.path.exists(socket_path):
+            if cls.server.poll() is not None or time.monotonic() > deadline:
+                cls.tearDownClass()
+                raise unittest.SkipTest("PulseAudio服务器启动失败")
+            time.sleep(0.05)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.terminate()
+        try:
+            cls.server.wait(TIMEOUT)
+        except subprocess.TimeoutExpired:
+            cls.server.kill()
+        if cls.saved_server is None:
+            os.environ.pop("PULSE_SERVER", None)
+        else:
+            os.environ["PULSE_SERVER"] = cls.saved_server
+        shutil.rmtree(cls.runtime_dir, ignore_errors=True)
+
+    def setUp(self):
+        self.backend = volume_utils.PulseAudioBackend("island-test")
+        self.addCleanup(self.backend.close)
+
+    def test_set_and_get_volume(self):
+        self.backend.set_volume(0.29)
+        self.assertAlmostEqual(self.backend.get_volume(), 0.29, places=2)
+        self.backend.set_volume(0.8)
+        self.assertAlmostEqual(self.backend.get_volume(), 0.8, places=2)
+
+    def test_set_and_get_mute(self):
+        self.backend.set_mute(True)
+        self.assertTrue(self.backend.get_mute())
+        self.backend.set_mute(False)
+        self.assertFalse(self.backend.get_mute())
+
+    def test_external_change_is_pushed(self):
+        self.backend.set_volume(0.5)
+        received = []
+        pushed = threading.Event()
+
+        def handler(volume, mute):
+            received.append((volume, mute))
+            if abs(volume - 0.35) < 0.01:
+                pushed.set()
+
+        self.assertTrue(self.backend.set_notification_handler(handler))
+        # 等监听连接订阅事件后再从另一个客户端修改音量
+        time.sleep(0.5)
+        import pulsectl
+        with pulsectl.Pulse("island-test-other") as other:
+            other.volume_set_all_chans(other.get_sink_by_name(SINK_NAME), 0.35)
+
+        self.assertTrue(pushed.wait(TIMEOUT), f"没有收到推送: {received}")
+        # 推送开启后读取使用缓存的状态，应与推送一致
+        self.assertAlmostEqual(self.backend.get_volume(), 0.35, places=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
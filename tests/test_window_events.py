@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+窗口事件唤醒音乐探针的测试，使用模拟的窗口事件源和窗口后端，不依赖win32
+
+没有安装PyQt5时跳过
+"""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    from PyQt5.QtWidgets import QApplication
+    has_pyqt = True
+except ImportError:
+    has_pyqt = False
+
+if has_pyqt:
+    import dynamic_island
+    import music_utils
+    import window_events
+    from dynamic_island import DynamicIsland, MUSIC_EVENT_DEBOUNCE, MUSIC_EVENT_MIN_SPACING
+
+PLAYER_HWND = 100
+OTHER_HWND = 200
+
+
+@unittest.skipUnless(has_pyqt and dynamic_island.has_music_utils, "需要PyQt5")
+class WindowEventWakeTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def setUp(self):
+        self.backend = music_utils.FakeWindowBackend()
+        self.backend.add_window(PLAYER_HWND, 10, "cloudmusic.exe", "OrpheusBrowserHost", "晴天 - 周杰伦")
+        self.backend.add_window(OTHER_HWND, 20, "chrome.exe", "Chrome_WidgetWin_1", "新标签页 - Google Chrome")
+        music_utils.use_window_backend(self.backend)
+        self.addCleanup(music_utils.use_window_backend, None)
+        dynamic_island.player_states.poll()
+
+        self.source = window_events.FakeWindowEventSource()
+        snapshot_path = os.path.join(tempfile.mkdtemp(prefix="island-test-"), "state.json")
+        self.island = DynamicIsland(event_source=self.source, snapshot_path=snapshot_path)
+        self.addCleanup(self.island.close)
+
+        # 停止后台调度，只记录事件回调安排的唤醒：(探针名称, 延迟, 预定执行的时间)
+        self.island.sensor_hub.stop()
+        self.island.sensor_hub.wait()
+        self.wakes = []
+        self.island.sensor_hub.wake = self.record_wake
+
+    def record_wake(self, name, delay=0.0):
+        self.wakes.append((name, delay, time.monotonic() + delay))
+
+    def test_player_title_change_wakes_music(self):
+        self.backend.set_title(PLAYER_HWND, "后来 - 刘若英")
+        self.source.fire(window_events.EVENT_TITLE, PLAYER_HWND)
+        self.assertEqual(len(self.wakes), 1)
+        name, delay, _ = self.wakes[0]
+        self.assertEqual(name, "music")
+        self.assertAlmostEqual(delay, MUSIC_EVENT_DEBOUNCE, places=3)
+
+    def test_other_window_title_is_filtered(self):
+        self.source.fire(window_events.EVENT_TITLE, OTHER_HWND)
+        self.assertEqual(self.wakes, [])
+
+        # 前台切换不经过标题过滤
+        self.source.fire(window_events.EVENT_FOREGROUND, OTHER_HWND)
+        self.assertEqual([wake[0] for wake in self.wakes], ["music"])
+
+    def test_wakes_are_spaced(self):
+        # 已经安排了还没执行的唤醒时，后续事件不再重复安排
+        for _ in range(10):
+            self.source.fire(window_events.EVENT_TITLE, PLAYER_HWND)
+        self.assertEqual(len(self.wakes), 1)
+
+        # 上次唤醒执行后的事件，距离上次唤醒至少MUSIC_EVENT_MIN_SPACING
+        time.sleep(MUSIC_EVENT_DEBOUNCE * 2)
+        self.source.fire(window_events.EVENT_TITLE, PLAYER_HWND)
+        self.assertEqual(len(self.wakes), 2)
+        spacing = self.wakes[1][2] - self.wakes[0][2]
+        self.assertGreaterEqual(spacing, MUSIC_EVENT_MIN_SPACING - 0.01)
+        self.assertGreater(self.wakes[1][1], MUSIC_EVENT_DEBOUNCE)
+
+
+if __name__ == "__main__":
+    unittest.main()
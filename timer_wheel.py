@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+定时轮模块，统一管理周期任务和对齐到墙上时间边界的时钟任务
+"""
+
+import math
+import time
+
+
+class TimerJob:
+    """
+    定时任务：周期任务按interval对齐，时钟任务对齐到本地时间的boundary整数倍
+    """
+
+    def __init__(self, name, interval=None, boundary=None):
+        self.name = name
+        self.interval = interval
+        self.boundary = boundary
+        # 下次执行的单调时钟时间，None表示只在手动触发时执行
+        self.deadline = None
+        # 时钟任务等待的墙上时间边界
+        self.wall_target = None
+
+
+class TimerWheel:
+    """
+    共享定时轮
+
+    周期任务的到期时间对齐到公共起点加间隔的整数倍，间隔互为倍数的任务会一起到期；
+    时钟任务每次都根据当前墙上时间重新计算下一个边界，不会累积漂移，
+    检测到墙上时间相对单调时钟跳变（休眠唤醒、修改系统时间）时立即重新对齐
+    """
+
+    # 墙上时间与单调时钟的差值变化超过该值时认为时钟发生了跳变（秒）
+    CLOCK_JUMP_THRESHOLD = 2.0
+    # 时钟任务在边界之后稍晚一点执行，保证读取到的时间已经跨过边界（秒）
+    BOUNDARY_EPSILON = 0.002
+
+    def __init__(self, monotonic=time.monotonic, wall=time.time):
+        self.monotonic = monotonic
+        self.wall = wall
+        self.jobs = {}
+        self.epoch = monotonic()
+        self.clock_offset = wall() - self.epoch
+
+    def add_periodic(self, name, interval):
+        """
+        添加周期任务，添加后立即到期一次；interval为None时只在手动触发时执行
+        """
+        job = TimerJob(name, interval=interval)
+        job.deadline = self.monotonic()
+        self.jobs[name] = job
+
+    def add_clock(self, name, boundary=60.0):
+        """
+        添加时钟任务，在每个本地时间的boundary整数倍（如整分钟）执行，添加后立即到期一次
+        """
+        job = TimerJob(name, boundary=boundary)
+        job.deadline = self.monotonic()
+        self.jobs[name] = job
+
+    def set_interval(self, name, interval):
+        """
+        修改周期任务的间隔，从当前时刻重新对齐
+        """
+        job = self.jobs[name]
+        job.interval = interval
+        job.deadline = self._next_periodic(self.monotonic(), interval)
+
+    def trigger(self, name, delay=0.0):
+        """
+        让任务在delay秒后执行一次，与已有的到期时间取较早者
+        """
+        job = self.jobs.get(name)
+        if job is None:
+            return
+        deadline = self.monotonic() + delay
+        if job.deadline is None or deadline < job.deadline:
+            job.deadline = deadline
+            job.wall_target = None
+
+    def resync(self):
+        """
+        重新对齐所有时钟任务并让它们立即执行，用于休眠唤醒或系统时间变化之后
+        """
+        now = self.monotonic()
+        self.clock_offset = self.wall() - now
+        for job in self.jobs.values():
+            if job.boundary is not None:
+                job.deadline = now
+                job.wall_target = None
+
+    def check_clock(self):
+        """
+        检查墙上时间是否相对单调时钟跳变（休眠唤醒、修改系统时间），跳变时重新对齐并返回True
+        """
+        offset = self.wall() - self.monotonic()
+        if abs(offset - self.clock_offset) > self.CLOCK_JUMP_THRESHOLD:
+            self.resync()
+            return True
+        return False
+
+    def next_deadline(self):
+        """
+        返回最早的到期时间（单调时钟），没有任务时返回None
+        """
+        deadlines = [job.deadline for job in self.jobs.values() if job.deadline is not None]
+        return min(deadlines) if deadlines else None
+
+    def pop_due(self):
+        """
+        返回所有已到期的任务名称，并安排它们的下一次执行
+        """
+        self.check_clock()
+        now = self.monotonic()
+        wall_now = self.wall()
+
+        due = []
+        for job in self.jobs.values():
+            if job.deadline is None or job.deadline > now:
+                continue
+
+            # 定时器提前醒来时还没跨过边界，等到边界之后再执行，保证显示不会滞后
+            if job.wall_target is not None and wall_now < job.wall_target:
+                job.deadline = now + (job.wall_target - wall_now)
+                continue
+
+            due.append(job.name)
+            if job.boundary is not None:
+                job.wall_target = self._next_boundary(wall_now, job.boundary)
+                job.deadline = now + (job.wall_target - wall_now)
+            else:
+                job.deadline = self._next_periodic(now, job.interval)
+        return due
+
+    def _next_periodic(self, now, interval):
+        # 对齐到公共起点之后下一个间隔整数倍的时刻
+        if interval is None:
+            return None
+        periods = math.floor((now - self.epoch) / interval) + 1
+        return self.epoch + periods * interval
+
+    def _next_boundary(self, wall_now, boundary):
+        # 按本地时区计算下一个边界，返回对应的墙上时间
+        utc_offset = time.localtime(wall_now).tm_gmtoff
+        local_now = wall_now + utc_offset
+        next_local = (math.floor(local_now / boundary) + 1) * boundary
+        return next_local - utc_offset + self.BOUNDARY_EPSILON
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+窗口标题解析模块，按播放器的标题格式规则提取歌曲名和艺术家
+"""
+
+import re
+from functools import lru_cache
+
+# 标题中字段的顺序
+SONG_ARTIST = ("song", "artist")
+ARTIST_SONG = ("artist", "song")
+
+# 没有配置规则时使用的默认格式
+DEFAULT_TITLE_FORMAT = {
+    "separators": [" - "],
+    "field_order": SONG_ARTIST,
+    "strip_suffixes": [],
+    "idle_titles": []
+}
+
+
+class TitleGrammar:
+    """
+    单个播放器的标题格式，在创建时编译为正则表达式
+    """
+
+    def __init__(self, player_name, title_format=None):
+        title_format = dict(DEFAULT_TITLE_FORMAT, **(title_format or {}))
+        self.player_name = player_name
+        self.field_order = tuple(title_format["field_order"])
+
+        # 播放器空闲时的标题（只显示播放器名称）
+        self.idle_titles = frozenset(title_format["idle_titles"]) | {player_name}
+
+        # 需要去除的后缀，长的优先匹配
+        suffixes = sorted(title_format["strip_suffixes"], key=len, reverse=True)
+        if suffixes:
+            self.suffix_pattern = re.compile("(?:%s)$" % "|".join(re.escape(s) for s in suffixes))
+        else:
+            self.suffix_pattern = None
+
+        # 歌曲名中也可能含有分隔符：歌曲在前时按最后一个分隔符切分，艺术家在前时按第一个
+        separators = sorted(title_format["separators"], key=len, reverse=True)
+        separator = "|".join(re.escape(s) for s in separators)
+        if self.field_order == SONG_ARTIST:
+            pattern = r"^(?P<song>.+)(?:%s)(?P<artist>.+)$" % separator
+        else:
+            pattern = r"^(?P<artist>.+?)(?:%s)(?P<song>.+)$" % separator
+        self.pattern = re.compile(pattern)
+
+    def parse(self, title):
+        """
+        解析窗口标题，返回 (歌曲名, 艺术家)
+        """
+        title = title.strip()
+        if self.suffix_pattern is not None:
+            title = self.suffix_pattern.sub("", title).strip()
+
+        if not title or title in self.idle_titles:
+            return None, None
+
+        match = self.pattern.match(title)
+        if match:
+            return match.group("song").strip(), match.group("artist").strip()
+
+        # 如果没有匹配的格式，返回整个标题作为歌曲名
+        return title, ""
+
+
+class TitleParser:
+    """
+    多播放器标题解析器，解析结果按 (播放器名称, 标题) 缓存
+    """
+
+    def __init__(self, players, cache_size=256):
+        # 加载时一次性编译所有播放器的规则
+        self.grammars = {
+            player_name: TitleGrammar(player_name, player_info.get("title_format"))
+            for player_name, player_info in players.items()
+        }
+        self._parse_cached = lru_cache(maxsize=cache_size)(self._parse)
+
+    def _grammar_for(self, player_name):
+        grammar = self.grammars.get(player_name)
+        if grammar is None:
+            grammar = TitleGrammar(player_name)
+            self.grammars[player_name] = grammar
+        return grammar
+
+    def _parse(self, player_name, title):
+        return self._grammar_for(player_name).parse(title)
+
+    def parse(self, player_name, title):
+        """
+        解析窗口标题，相同的标题不会重复解析
+        """
+        if not title:
+            return None, None
+        return self._parse_cached(player_name, title)
+
+    def cache_info(self):
+        """
+        返回解析缓存的命中统计
+        """
+        return self._parse_cached.cache_info()
+
+    def cache_clear(self):
+        """
+        清空解析缓存
+        """
+        self._parse_cached.cache_clear()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+视图模型模块，记录每个标签最后渲染的内容，只在内容变化时更新控件
+"""
+
+from PyQt5.QtCore import QTimer
+
+
+class LabelViewModel:
+    """
+    标签视图模型
+
+    内容没有变化的setText和setPixmap会被直接跳过；真正的变化先暂存起来，
+    在当前事件循环结束时一次性应用。不暂停整个窗口的更新：重新启用更新会重绘整个窗口，
+    而Qt本身会合并同一轮事件循环中的布局请求，每个标签只重绘自己的区域
+    """
+
+    def __init__(self, container):
+        # 标签所在的顶层窗口
+        self.container = container
+        # 标签 -> 已经渲染的文本
+        self.rendered = {}
+        # 标签 -> 等待应用的文本
+        self.pending = {}
+        # 标签 -> 已经显示的位图键
+        self.rendered_pixmaps = {}
+        # 标签 -> 等待应用的(位图键, 位图)
+        self.pending_pixmaps = {}
+        self.flush_scheduled = False
+        # 统计：跳过的更新次数、实际应用的更新次数和批量刷新次数
+        self.skipped = 0
+        self.applied = 0
+        self.flushes = 0
+
+    def set_text(self, label, text):
+        """
+        设置标签文本，内容没有变化时不做任何事
+        """
+        rendered = self.rendered.get(label)
+        if rendered is None:
+            rendered = label.text()
+            self.rendered[label] = rendered
+
+        if text == self.pending.get(label, rendered):
+            self.skipped += 1
+            return
+
+        if text == rendered:
+            # 暂存的修改又被改回原值，本轮不需要更新
+            del self.pending[label]
+            self.skipped += 1
+            return
+
+        self.pending[label] = text
+        self.schedule_flush()
+
+    def set_pixmap(self, label, key, pixmap):
+        """
+        设置标签位图，key与已显示的位图相同时不做任何事
+        """
+        rendered = self.rendered_pixmaps.get(label)
+        pending = self.pending_pixmaps.get(label)
+        if key == (pending[0] if pending is not None else rendered):
+            self.skipped += 1
+            return
+
+        if key == rendered:
+            del self.pending_pixmaps[label]
+            self.skipped += 1
+            return
+
+        self.pending_pixmaps[label] = (key, pixmap)
+        self.schedule_flush()
+
+    def schedule_flush(self):
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            QTimer.singleShot(0, self.flush)
+
+    def flush(self):
+        """
+        应用所有暂存的修改
+        """
+        self.flush_scheduled = False
+        if not self.pending and not self.pending_pixmaps:
+            return
+
+        pending = self.pending
+        self.pending = {}
+        pending_pixmaps = self.pending_pixmaps
+        self.pending_pixmaps = {}
+
+        for label, text in pending.items():
+            label.setText(text)
+            self.rendered[label] = text
+            self.applied += 1
+        for label, (key, pixmap) in pending_pixmaps.items():
+            label.setPixmap(pixmap)
+            self.rendered_pixmaps[label] = key
+            self.applied += 1
+        self.flushes += 1
+
+    def stats(self):
+        """
+        返回更新统计
+        """
+        return {
+            "skipped": self.skipped,
+            "applied": self.applied,
+            "flushes": self.flushes
+        }
@@ -1,13 +1,28 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-音量控制工具模块，用于控制Windows系统音量
+音量控制工具模块，用于控制Windows系统音量，Linux上通过PulseAudio/PipeWire控制
 """
 
-import win32api
-import win32con
-import win32com.client
-import pythoncom
+import threading
+import time
+
+# win32模块只在Windows上可用，其他平台可以通过use_backend注入模拟后端
+try:
+    import win32api
+    import win32con
+    import pythoncom
+    has_win32 = True
+except ImportError:
+    has_win32 = False
+
+# Linux上通过pulsectl连接PulseAudio（PipeWire的pipewire-pulse兼容同一协议）
+# pulsectl在导入时就加载libpulse，系统没有安装该库时抛出的是OSError
+try:
+    import pulsectl
+    has_pulsectl = True
+except (ImportError, OSError):
+    has_pulsectl = False
 
 # 初始化音量控制变量
 volume_initialized = False
@@ -15,87 +30,629 @@ volume_object = None
 mute_state = False
 current_volume = 0.5  # 默认音量50%
 
-# 初始化音量控制
+# 后端只初始化一次，由第一次调用或后台初始化线程完成
+_init_lock = threading.Lock()
+_init_done = False
 
-# 尝试使用pycaw库获取真实音量
-volume_interface = None
+# 已调用过CoInitialize的线程
+_com_thread_state = threading.local()
 
-try:
-    # 初始化COM
-    pythoncom.CoInitialize()
+def _ensure_com_initialized():
+    """
+    确保当前线程已初始化COM
+    """
+    if not has_win32:
+        return
+    if not getattr(_com_thread_state, "initialized", False):
+        pythoncom.CoInitialize()
+        _com_thread_state.initialized = True
+
+class TimedBackend:
+    """
+    记录每种操作耗时的音量后端基类
+    """
     
-    # 尝试获取Core Audio API接口
-    try:
-        from ctypes import cast, POINTER
-        from comtypes import CLSCTX_ALL
-        from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+    def __init__(self):
+        # 操作名 -> [次数, 总耗时, 最大耗时, 最近一次耗时]（秒）
+        self.timings = {}
+        self._lock = threading.RLock()
+    
+    def _record(self, name, elapsed):
+        stats = self.timings.get(name)
+        if stats is None:
+            self.timings[name] = [1, elapsed, elapsed, elapsed]
+        else:
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = max(stats[2], elapsed)
+            stats[3] = elapsed
+    
+    def timing_stats(self):
+        """
+        返回各操作的耗时统计（毫秒）
+        """
+        with self._lock:
+            return {
+                name: {
+                    "count": count,
+                    "avg_ms": total / count * 1000,
+                    "max_ms": longest * 1000,
+                    "last_ms": last * 1000
+                }
+                for name, (count, total, longest, last) in self.timings.items()
+            }
+
+class CoreAudioBackend(TimedBackend):
+    """
+    Core Audio音量后端，打开一次端点后持续复用
+    
+    只有默认音频设备变化或端点调用失败时才重新获取端点，
+    每次读写的耗时都会记录下来
+    """
+    
+    # 无法订阅设备变化通知时，定期检查默认设备的间隔（秒）
+    DEVICE_RECHECK_INTERVAL = 30.0
+    
+    def __init__(self):
+        super().__init__()
+        self.endpoint = None
+        self.stale = True
+        self.device_watcher = None
+        self.device_enumerator = None
+        self.opened_at = 0.0
+        # 音量变化推送的处理函数和已注册的端点回调
+        self.notification_handler = None
+        self.volume_callback = None
+    
+    def _open(self):
+        from pycaw.pycaw import AudioUtilities
         
-        # 获取音频设备
+        # 获取默认音频设备和端点
         devices = AudioUtilities.GetSpeakers()
+        old_endpoint = self.endpoint
+        self.endpoint = devices.EndpointVolume
+        self.stale = False
+        self.opened_at = time.monotonic()
+        
+        if self.device_watcher is None:
+            self.device_watcher = self._watch_default_device()
+        
+        # 端点重新打开后，把音量变化回调迁移到新端点上
+        if self.volume_callback is not None:
+            try:
+                old_endpoint.UnregisterControlChangeNotify(self.volume_callback)
+            except Exception:
+                pass
+            self.volume_callback = None
+            try:
+                self._register_volume_callback()
+            except Exception:
+                pass
+    
+    def _watch_default_device(self):
+        # 订阅默认设备变化通知，设备切换后下次调用时重新打开端点
+        try:
+            from pycaw.callbacks import MMNotificationClient
+            from pycaw.pycaw import AudioUtilities
+            
+            backend = self
+            
+            class DefaultDeviceWatcher(MMNotificationClient):
+                def on_default_device_changed(self, *args):
+                    backend.invalidate()
+            
+            watcher = DefaultDeviceWatcher()
+            enumerator = AudioUtilities.GetDeviceEnumerator()
+            enumerator.RegisterEndpointNotificationCallback(watcher)
+            # 保留枚举器引用，避免通知注册随对象释放而失效
+            self.device_enumerator = enumerator
+            return watcher
+        except Exception:
+            return None
+    
+    def invalidate(self):
+        """
+        标记端点失效，下次调用时重新打开
+        """
+        self.stale = True
         
-        # 获取音频端点（使用EndpointVolume属性）
-        endpoint = devices.EndpointVolume
+        # 有推送订阅时不会再有主动调用，需要立即在新设备上重新注册
+        if self.notification_handler is not None:
+            threading.Thread(target=self._reopen_and_notify, daemon=True).start()
+    
+    def _reopen_and_notify(self):
+        try:
+            volume = self.get_volume()
+            mute = self.get_mute()
+        except Exception:
+            return
+        handler = self.notification_handler
+        if handler is not None:
+            handler(volume, mute)
+    
+    def _register_volume_callback(self):
+        # 在当前端点上注册IAudioEndpointVolumeCallback
+        from pycaw.callbacks import AudioEndpointVolumeCallback
+        
+        backend = self
         
-        # 获取实际音量和静音状态
-        current_volume = endpoint.GetMasterVolumeLevelScalar()
-        mute_state = endpoint.GetMute()
+        class VolumeChangeCallback(AudioEndpointVolumeCallback):
+            def on_notify(self, new_volume, new_mute, event_context, channels, channel_volumes):
+                handler = backend.notification_handler
+                if handler is not None:
+                    handler(new_volume, bool(new_mute))
+        
+        callback = VolumeChangeCallback()
+        self.endpoint.RegisterControlChangeNotify(callback)
+        self.volume_callback = callback
+    
+    def set_notification_handler(self, handler):
+        """
+        设置音量变化推送的处理函数，返回是否注册成功
+        """
+        with self._lock:
+            _ensure_com_initialized()
+            self.notification_handler = handler
+            if self.volume_callback is not None:
+                return True
+            try:
+                self._get_endpoint()
+                if self.volume_callback is None:
+                    self._register_volume_callback()
+                return True
+            except Exception:
+                self.notification_handler = None
+                return False
+    
+    def _get_endpoint(self):
+        if self.endpoint is not None and self.device_watcher is None:
+            if time.monotonic() - self.opened_at > self.DEVICE_RECHECK_INTERVAL:
+                self.stale = True
+        if self.stale or self.endpoint is None:
+            self._open()
+        return self.endpoint
+    
+    def call(self, name, func):
+        """
+        在端点上执行一次操作并记录耗时，失败时重新打开端点重试一次
+        """
+        with self._lock:
+            _ensure_com_initialized()
+            start = time.perf_counter()
+            try:
+                try:
+                    return func(self._get_endpoint())
+                except Exception:
+                    # 设备可能已被移除，重新打开端点后再试一次
+                    self.stale = True
+                    return func(self._get_endpoint())
+            finally:
+                self._record(name, time.perf_counter() - start)
+    
+    def get_volume(self):
+        return self.call("get_volume", lambda endpoint: endpoint.GetMasterVolumeLevelScalar())
+    
+    def get_mute(self):
+        return bool(self.call("get_mute", lambda endpoint: endpoint.GetMute()))
+    
+    def set_volume(self, level):
+        self.call("set_volume", lambda endpoint: endpoint.SetMasterVolumeLevelScalar(level, None))
+    
+    def set_mute(self, mute):
+        self.call("set_mute", lambda endpoint: endpoint.SetMute(bool(mute), None))
+
+class PulseAudioBackend(TimedBackend):
+    """
+    PulseAudio/PipeWire音量后端，保持一个命令连接，读写默认输出设备（sink）
+    
+    订阅推送后另开一个连接在后台线程监听sink和服务器事件：
+    sink变化时读取一次最新状态并推送，默认设备切换时重新解析默认sink；
+    推送开启后读取音量直接使用缓存的状态，设置音量也只需要一次请求；
+    服务器重启（例如PipeWire重启）后命令连接在下一次请求时重建，监听连接按退避间隔重连
+    """
+    
+    # 事件监听的超时时间（秒），用于及时响应stop
+    LISTEN_TIMEOUT = 1.0
+    # 监听连接断开后重连的初始间隔和最大间隔（秒），每次失败后加倍
+    RECONNECT_DELAY = 1.0
+    RECONNECT_MAX_DELAY = 30.0
+    
+    def __init__(self, client_name="dynamic-island"):
+        super().__init__()
+        self.client_name = client_name
+        self.pulse = pulsectl.Pulse(client_name)
+        self.sink_name = None
+        # 最近一次读取到的默认sink，推送开启时由监听线程保持最新
+        self.sink = None
+        self.notification_handler = None
+        self.listener = None
+        self.running = False
+        self.stopped = threading.Event()
+        self.sink_changed = threading.Event()
+        self.default_changed = threading.Event()
+    
+    def _reconnect(self):
+        # 连接断开后旧连接不能再使用，关闭后重新建立；缓存的sink索引也可能已经变化
+        try:
+            self.pulse.close()
+        except Exception:
+            pass
+        self.sink_name = None
+        self.sink = None
+        self.pulse = pulsectl.Pulse(self.client_name)
+    
+    def _on_sink(self, func, cached=False):
+        # 需要在持有锁时调用
+        try:
+            if cached and self.sink is not None:
+                return func(self.sink)
+            return func(self._default_sink())
+        except (pulsectl.PulseError, pulsectl.PulseDisconnected):
+            if not self.pulse.connected:
+                # 服务器重启或连接断开，重建命令连接后再试一次
+                self._reconnect()
+            else:
+                # 默认设备可能已被移除，重新解析后再试一次
+                self.sink_name = None
+        return func(self._default_sink())
+    
+    def _default_sink(self):
+        # 解析默认sink并读取其状态，一次往返
+        if self.sink_name is None:
+            self.sink_name = self.pulse.server_info().default_sink_name
+        self.sink = self.pulse.get_sink_by_name(self.sink_name)
+        return self.sink
+    
+    def call(self, name, func, cached=False):
+        """
+        在默认sink上执行一次操作并记录耗时；cached为True时使用缓存的sink，不先读取一次
+        """
+        with self._lock:
+            start = time.perf_counter()
+            try:
+                return self._on_sink(func, cached)
+            finally:
+                self._record(name, time.perf_counter() - start)
+    
+    def get_volume(self):
+        return self.call("get_volume", lambda sink: sink.volume.value_flat, cached=self.running)
+    
+    def get_mute(self):
+        return bool(self.call("get_mute", lambda sink: sink.mute, cached=self.running))
+    
+    # 写操作只需要sink的索引和声道数，直接使用缓存的sink，一次请求完成；
+    # pulsectl会同时更新sink对象上的音量和静音状态，缓存保持一致
+    def set_volume(self, level):
+        self.call("set_volume", lambda sink: self.pulse.volume_set_all_chans(sink, level), cached=True)
+    
+    def set_mute(self, mute):
+        self.call("set_mute", lambda sink: self.pulse.mute(sink, bool(mute)), cached=True)
+    
+    def set_notification_handler(self, handler):
+        """
+        设置音量变化推送的处理函数，返回是否开始监听
+        """
+        with self._lock:
+            self.notification_handler = handler
+            if self.listener is None:
+                self.running = True
+                self.stopped.clear()
+                self.listener = threading.Thread(target=self._listen, daemon=True)
+                self.listener.start()
+            return True
+    
+    def _on_event(self, event):
+        # 在监听连接的事件循环中执行，不能在这里调用其他请求，只记录后退出循环
+        if event.facility == pulsectl.PulseEventFacilityEnum.server:
+            self.default_changed.set()
+        self.sink_changed.set()
+        raise pulsectl.PulseLoopStop
+    
+    def _listen(self):
+        delay = self.RECONNECT_DELAY
+        reconnecting = False
+        try:
+            while self.running:
+                try:
+                    with pulsectl.Pulse(self.client_name + "-events") as events:
+                        events.event_mask_set("sink", "server")
+                        events.event_callback_set(self._on_event)
+                        delay = self.RECONNECT_DELAY
+                        if reconnecting:
+                            # 断开期间的变化没有收到事件，重连后重新读取一次
+                            self.default_changed.set()
+                            self.sink_changed.set()
+                        while self.running:
+                            if not self.sink_changed.is_set():
+                                events.event_listen(timeout=self.LISTEN_TIMEOUT)
+                                if not self.sink_changed.is_set():
+                                    continue
+                            self.sink_changed.clear()
+                            self._notify()
+                except Exception as e:
+                    if not self.running:
+                        break
+                    print(f"PulseAudio事件监听断开，{delay:g}秒后重连: {e}")
+                if not self.running:
+                    break
+                reconnecting = True
+                if self.stopped.wait(delay):
+                    break
+                delay = min(delay * 2, self.RECONNECT_MAX_DELAY)
+        finally:
+            self.running = False
+            self.listener = None
+    
+    def _notify(self):
+        # 在命令连接上读取一次最新状态，有变化时推送
+        with self._lock:
+            old = (self.sink.volume.value_flat, self.sink.mute) if self.sink is not None else None
+            if self.default_changed.is_set():
+                self.default_changed.clear()
+                self.sink_name = None
+            try:
+                sink = self._on_sink(lambda sink: sink)
+            except (pulsectl.PulseError, pulsectl.PulseDisconnected):
+                return
+            volume, mute = sink.volume.value_flat, bool(sink.mute)
+        handler = self.notification_handler
+        if handler is not None and (volume, mute) != old:
+            handler(volume, mute)
+    
+    def close(self):
+        """
+        停止监听并关闭命令连接
+        """
+        self.running = False
+        self.stopped.set()
+        listener = self.listener
+        if listener is not None:
+            listener.join(self.LISTEN_TIMEOUT * 2)
+        with self._lock:
+            self.pulse.close()
+
+class FakeVolumeBackend:
+    """
+    模拟音量后端，用于测试和没有音频设备的环境
+    """
+    
+    def __init__(self, volume=0.5, mute=False, push_supported=True):
+        self.volume = volume
+        self.mute = mute
+        self.push_supported = push_supported
+        self.notification_handler = None
+    
+    def get_volume(self):
+        return self.volume
+    
+    def get_mute(self):
+        return self.mute
+    
+    def set_volume(self, level):
+        self.simulate_change(volume=level)
+    
+    def set_mute(self, mute):
+        self.simulate_change(mute=bool(mute))
+    
+    def set_notification_handler(self, handler):
+        if not self.push_supported:
+            return False
+        self.notification_handler = handler
+        return True
+    
+    def simulate_change(self, volume=None, mute=None):
+        """
+        模拟系统音量被外部修改（例如键盘或托盘），触发推送
+        """
+        if volume is not None:
+            self.volume = volume
+        if mute is not None:
+            self.mute = mute
+        if self.notification_handler is not None:
+            self.notification_handler(self.volume, self.mute)
+    
+    def timing_stats(self):
+        return {}
+
+# 尝试使用pycaw库获取真实音量
+audio_backend = None
+
+def _initialize():
+    """
+    初始化音量控制：优先使用Core Audio端点，失败时使用模拟按键方式
+    """
+    global audio_backend, volume_initialized, volume_object, current_volume, mute_state
+    if not has_win32:
+        if not has_pulsectl:
+            print("未找到win32模块和pulsectl模块，音量控制功能不可用")
+            return
+        try:
+            backend = PulseAudioBackend()
+            current_volume = backend.get_volume()
+            mute_state = backend.get_mute()
+            audio_backend = backend
+            print("音量控制初始化成功!")
+            volume_initialized = True
+        except Exception as e:
+            print(f"连接PulseAudio失败，音量控制功能不可用: {e}")
+        return
+    
+    try:
+        # 初始化COM
+        _ensure_com_initialized()
         
-        print("音量控制初始化成功!")
-        volume_initialized = True
+        # 尝试获取Core Audio API接口
+        try:
+            backend = CoreAudioBackend()
+            
+            # 获取实际音量和静音状态
+            current_volume = backend.get_volume()
+            mute_state = backend.get_mute()
+            
+            audio_backend = backend
+            print("音量控制初始化成功!")
+            volume_initialized = True
+        except Exception as e:
+            # 如果Core Audio API失败，使用模拟按键方式
+            print(f"使用Core Audio API获取音量失败，将使用模拟按键方式: {e}")
+            import win32com.client
+            shell = win32com.client.Dispatch("WScript.Shell")
+            volume_object = shell
+            volume_initialized = True
+    
     except Exception as e:
-        # 如果Core Audio API失败，使用模拟按键方式
-        print(f"使用Core Audio API获取音量失败，将使用模拟按键方式: {e}")
-        shell = win32com.client.Dispatch("WScript.Shell")
-        volume_object = shell
-        volume_initialized = True
+        print(f"初始化音量控制失败: {e}")
+        volume_initialized = False
+        volume_object = None
+
+def initialize():
+    """
+    初始化音量后端，只在第一次调用时执行，返回音量控制是否可用
+    其他线程正在初始化时会等待其完成
+    """
+    global _init_done
+    with _init_lock:
+        if not _init_done:
+            _initialize()
+            _init_done = True
+    return volume_initialized
+
+def initialize_in_background(callback=None):
+    """
+    在后台线程中初始化音量后端，完成后在该线程中调用callback
+    """
+    def run():
+        try:
+            initialize()
+        finally:
+            if callback is not None:
+                callback()
+    
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+def is_initialized():
+    """
+    后端是否已经完成初始化（无论是否可用），不会触发初始化
+    """
+    return _init_done
+
+# 音量变化订阅者
+_volume_listeners = []
+
+def _dispatch_volume_change(volume, mute):
+    # 后端推送的音量变化，在回调线程中执行
+    global current_volume, mute_state
+    current_volume = volume
+    mute_state = mute
+    for listener in list(_volume_listeners):
+        try:
+            listener(volume, mute)
+        except Exception:
+            pass
+
+def _enable_push_notifications():
+    if audio_backend is None:
+        return False
+    try:
+        return audio_backend.set_notification_handler(_dispatch_volume_change)
+    except Exception:
+        return False
+
+def subscribe(callback):
+    """
+    订阅音量和静音变化，回调参数为 (音量0.0-1.0, 是否静音)
+    回调可能在COM线程中执行；返回False表示无法推送，需要自行轮询
+    """
+    if callback not in _volume_listeners:
+        _volume_listeners.append(callback)
+    return _enable_push_notifications()
+
+def unsubscribe(callback):
+    """
+    取消订阅音量变化
+    """
+    if callback in _volume_listeners:
+        _volume_listeners.remove(callback)
 
-except Exception as e:
-    print(f"初始化音量控制失败: {e}")
-    volume_initialized = False
-    volume_object = None
+def use_backend(backend):
+    """
+    替换音量后端，例如在测试中使用FakeVolumeBackend
+    """
+    global audio_backend, volume_initialized, current_volume, mute_state, _init_done
+    with _init_lock:
+        _init_done = True
+    audio_backend = backend
+    volume_initialized = True
+    current_volume = backend.get_volume()
+    mute_state = backend.get_mute()
+    if _volume_listeners:
+        _enable_push_notifications()
+
+def get_timing_stats():
+    """
+    获取音量后端各操作的耗时统计
+    """
+    if audio_backend is None:
+        return {}
+    return audio_backend.timing_stats()
 
 def get_volume():
     """
     获取当前系统音量 (0.0 - 1.0)
     """
     global current_volume
+    initialize()
     
     # 尝试从Core Audio API获取实际音量
-    try:
-        from pycaw.pycaw import AudioUtilities
-        
-        # 获取音频设备和端点
-        devices = AudioUtilities.GetSpeakers()
-        endpoint = devices.EndpointVolume
-        current_volume = endpoint.GetMasterVolumeLevelScalar()
-    except Exception as e:
-        # 如果获取失败，使用本地记录的音量
-        pass
+    if audio_backend is not None:
+        try:
+            current_volume = audio_backend.get_volume()
+        except Exception:
+            # 如果获取失败，使用本地记录的音量
+            pass
     
     return current_volume
 
+def _send_volume_keys(key, count=1):
+    # 模拟按键方式调节音量，每次按键约为2%且会显示系统音量浮层
+    for _ in range(count):
+        win32api.keybd_event(key, 0, 0, 0)
+        win32api.keybd_event(key, 0, win32con.KEYEVENTF_KEYUP, 0)
+
 def set_volume(level):
     """
     设置系统音量 (0.0 - 1.0)
     """
     global current_volume
-    if not volume_initialized:
+    if not initialize():
         return False
+    
+    # 确保音量在有效范围内
+    level = max(0.0, min(1.0, level))
+    
+    # 优先通过Core Audio端点直接设置绝对音量
+    if audio_backend is not None:
+        try:
+            audio_backend.set_volume(level)
+            current_volume = level
+            return True
+        except Exception as e:
+            print(f"通过音量后端设置音量失败: {e}")
+            # 只有Windows上可以退回到模拟按键方式
+            if not has_win32:
+                return False
+            print("将使用模拟按键方式调节音量")
+    
     try:
-        # 确保音量在有效范围内
-        level = max(0.0, min(1.0, level))
-        
         # 计算需要增加或减少的步数
         steps = int(abs(level - current_volume) / 0.05) + 1
         
         if level > current_volume:
-            for _ in range(steps):
-                win32api.keybd_event(win32con.VK_VOLUME_UP, 0, 0, 0)
-                win32api.keybd_event(win32con.VK_VOLUME_UP, 0, win32con.KEYEVENTF_KEYUP, 0)
+            _send_volume_keys(win32con.VK_VOLUME_UP, steps)
         else:
-            for _ in range(steps):
-                win32api.keybd_event(win32con.VK_VOLUME_DOWN, 0, 0, 0)
-                win32api.keybd_event(win32con.VK_VOLUME_DOWN, 0, win32con.KEYEVENTF_KEYUP, 0)
+            _send_volume_keys(win32con.VK_VOLUME_DOWN, steps)
         
         current_volume = level
         return True
@@ -109,14 +666,18 @@ def increase_volume(step=0.05):
     增加系统音量
     """
     global current_volume
-    if not volume_initialized:
+    if not initialize():
         return False
+    
+    # 以设备的实际音量为基准设置绝对音量
+    if audio_backend is not None:
+        return set_volume(get_volume() + step)
+    
     try:
         new_volume = min(1.0, current_volume + step)
         
         # 使用模拟按键方式增加音量
-        win32api.keybd_event(win32con.VK_VOLUME_UP, 0, 0, 0)
-        win32api.keybd_event(win32con.VK_VOLUME_UP, 0, win32con.KEYEVENTF_KEYUP, 0)
+        _send_volume_keys(win32con.VK_VOLUME_UP)
         
         # 更新本地音量记录
         current_volume = new_volume
@@ -130,14 +691,18 @@ def decrease_volume(step=0.05):
     减少系统音量
     """
     global current_volume
-    if not volume_initialized:
+    if not initialize():
         return False
+    
+    # 以设备的实际音量为基准设置绝对音量
+    if audio_backend is not None:
+        return set_volume(get_volume() - step)
+    
     try:
         new_volume = max(0.0, current_volume - step)
         
         # 使用模拟按键方式减少音量
-        win32api.keybd_event(win32con.VK_VOLUME_DOWN, 0, 0, 0)
-        win32api.keybd_event(win32con.VK_VOLUME_DOWN, 0, win32con.KEYEVENTF_KEYUP, 0)
+        _send_volume_keys(win32con.VK_VOLUME_DOWN)
         
         # 更新本地音量记录
         current_volume = new_volume
@@ -146,17 +711,53 @@ def decrease_volume(step=0.05):
         print(f"减少音量失败: {e}")
         return False
 
-def toggle_mute():
+def change_volume(delta, step=0.05):
     """
-    切换系统静音状态
+    按净变化量调节系统音量，用于合并连续的多次调节
+    """
+    if not initialize():
+        return False
+    
+    # 有Core Audio端点时一次设置到目标音量
+    if audio_backend is not None:
+        return set_volume(get_volume() + delta)
+    
+    # 模拟按键方式只能逐步调节
+    steps = int(round(abs(delta) / step))
+    adjust = increase_volume if delta > 0 else decrease_volume
+    for _ in range(steps):
+        if not adjust(step):
+            return False
+    return True
+
+def set_mute(mute):
+    """
+    设置系统静音状态
     """
     global mute_state
-    if not volume_initialized:
+    if not initialize():
         return False
+    
+    if audio_backend is not None:
+        try:
+            audio_backend.set_mute(mute)
+            mute_state = bool(mute)
+            return True
+        except Exception as e:
+            print(f"通过音量后端设置静音失败: {e}")
+            if not has_win32:
+                return False
+            print("将使用模拟按键方式切换静音")
+    
+    if bool(mute) == mute_state:
+        return True
+    return _toggle_mute_by_key()
+
+def _toggle_mute_by_key():
+    global mute_state
     try:
         # 使用模拟按键方式切换静音
-        win32api.keybd_event(win32con.VK_VOLUME_MUTE, 0, 0, 0)
-        win32api.keybd_event(win32con.VK_VOLUME_MUTE, 0, win32con.KEYEVENTF_KEYUP, 0)
+        _send_volume_keys(win32con.VK_VOLUME_MUTE)
         
         # 更新本地静音记录
         mute_state = not mute_state
@@ -165,23 +766,32 @@ def toggle_mute():
         print(f"切换静音失败: {e}")
         return False
 
+def toggle_mute():
+    """
+    切换系统静音状态
+    """
+    if not initialize():
+        return False
+    
+    if audio_backend is not None:
+        return set_mute(not get_mute())
+    
+    return _toggle_mute_by_key()
+
 def get_mute():
     """
     获取当前系统静音状态
     """
     global mute_state
+    initialize()
     
     # 尝试从Core Audio API获取实际静音状态
-    try:
-        from pycaw.pycaw import AudioUtilities
-        
-        # 获取音频设备和端点
-        devices = AudioUtilities.GetSpeakers()
-        endpoint = devices.EndpointVolume
-        mute_state = endpoint.GetMute()
-    except Exception as e:
-        # 如果获取失败，使用本地记录的静音状态
-        pass
+    if audio_backend is not None:
+        try:
+            mute_state = audio_backend.get_mute()
+        except Exception:
+            # 如果获取失败，使用本地记录的静音状态
+            pass
     
     return mute_state
 
@@ -189,7 +799,8 @@ def get_volume_percentage():
     """
     获取当前系统音量百分比 (0-100)
     """
-    return int(get_volume() * 100)
+    # 四舍五入，0.29这样的值读回来是0.2899…，截断会显示为28%
+    return round(get_volume() * 100)
 
 def set_volume_percentage(percentage):
     """
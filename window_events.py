@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+窗口事件模块，订阅前台窗口切换和窗口标题变化事件
+"""
+
+import sys
+import threading
+
+# 事件类型
+EVENT_FOREGROUND = "foreground"  # 前台窗口切换
+EVENT_TITLE = "title"  # 窗口标题变化
+
+
+class WindowEventSource:
+    """
+    窗口事件源基类，子类负责在事件发生时调用 _notify
+    """
+
+    def __init__(self):
+        self._callbacks = []
+        self._lock = threading.Lock()
+        # 标题变化事件的过滤函数，参数为窗口句柄，返回False的事件直接丢弃
+        self._title_filter = None
+
+    def subscribe(self, callback):
+        """
+        订阅窗口事件，回调参数为 (事件类型, 窗口句柄)
+        """
+        with self._lock:
+            if callback not in self._callbacks:
+                self._callbacks.append(callback)
+
+    def unsubscribe(self, callback):
+        """
+        取消订阅窗口事件
+        """
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def set_title_filter(self, predicate):
+        """
+        设置标题变化事件的过滤函数；系统中任意窗口改标题都会产生事件，
+        只有过滤函数接受的窗口（例如播放器的窗口）才会通知订阅者，传入None取消过滤
+        """
+        self._title_filter = predicate
+
+    def start(self):
+        """
+        开始监听事件，成功返回True
+        """
+        return False
+
+    def stop(self):
+        """
+        停止监听事件
+        """
+        pass
+
+    def _notify(self, event_type, hwnd):
+        title_filter = self._title_filter
+        if event_type == EVENT_TITLE and title_filter is not None:
+            try:
+                if not title_filter(hwnd):
+                    return
+            except Exception:
+                return
+        with self._lock:
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            try:
+                callback(event_type, hwnd)
+            except Exception:
+                pass
+
+
+class FakeWindowEventSource(WindowEventSource):
+    """
+    模拟窗口事件源，用于无界面环境下手动触发事件
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.running = False
+
+    def start(self):
+        self.running = True
+        return True
+
+    def stop(self):
+        self.running = False
+
+    def fire(self, event_type=EVENT_TITLE, hwnd=0):
+        """
+        手动触发一个窗口事件
+        """
+        if self.running:
+            self._notify(event_type, hwnd)
+
+
+class Win32WindowEventSource(WindowEventSource):
+    """
+    基于SetWinEventHook的窗口事件源，在独立线程中运行消息循环
+    """
+
+    EVENT_SYSTEM_FOREGROUND = 0x0003
+    EVENT_OBJECT_NAMECHANGE = 0x800C
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    WINEVENT_SKIPOWNPROCESS = 0x0002
+    OBJID_WINDOW = 0
+    CHILDID_SELF = 0
+    WM_QUIT = 0x0012
+
+    def __init__(self):
+        super().__init__()
+        self._thread = None
+        self._thread_id = None
+        self._started = threading.Event()
+        self._ok = False
+        # 保存回调函数引用，防止被垃圾回收
+        self._proc = None
+
+    def start(self):
+        if self._thread is not None:
+            return self._ok
+        self._thread = threading.Thread(target=self._run, name="WindowEventHook", daemon=True)
+        self._thread.start()
+        self._started.wait(2.0)
+        return self._ok
+
+    def stop(self):
+        if self._thread is None:
+            return
+        try:
+            import ctypes
+            if self._thread_id:
+                ctypes.windll.user32.PostThreadMessageW(self._thread_id, self.WM_QUIT, 0, 0)
+        except Exception:
+            pass
+        self._thread.join(1.0)
+        self._thread = None
+
+    def _run(self):
+        hooks = []
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            user32 = ctypes.windll.user32
+            kernel32 = ctypes.windll.kernel32
+
+            WinEventProc = ctypes.WINFUNCTYPE(
+                None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+                wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD
+            )
+            user32.SetWinEventHook.restype = wintypes.HANDLE
+
+            def callback(hook, event, hwnd, id_object, id_child, thread_id, event_time):
+                # 只关心顶层窗口本身的事件，忽略控件和光标等对象
+                if id_object != self.OBJID_WINDOW or id_child != self.CHILDID_SELF:
+                    return
+                if event == self.EVENT_SYSTEM_FOREGROUND:
+                    self._notify(EVENT_FOREGROUND, hwnd)
+                elif event == self.EVENT_OBJECT_NAMECHANGE:
+                    self._notify(EVENT_TITLE, hwnd)
+
+            self._proc = WinEventProc(callback)
+            flags = self.WINEVENT_OUTOFCONTEXT | self.WINEVENT_SKIPOWNPROCESS
+            for event in (self.EVENT_SYSTEM_FOREGROUND, self.EVENT_OBJECT_NAMECHANGE):
+                hook = user32.SetWinEventHook(event, event, 0, self._proc, 0, 0, flags)
+                if hook:
+                    hooks.append(hook)
+
+            self._thread_id = kernel32.GetCurrentThreadId()
+            self._ok = len(hooks) == 2
+            self._started.set()
+            if not self._ok:
+                return
+
+            # 消息循环，钩子回调在此线程中派发
+            msg = wintypes.MSG()
+            while user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+                user32.TranslateMessage(ctypes.byref(msg))
+                user32.DispatchMessageW(ctypes.byref(msg))
+        except Exception as e:
+            print(f"窗口事件监听初始化失败: {e}")
+            self._ok = False
+            self._started.set()
+        finally:
+            try:
+                import ctypes
+                for hook in hooks:
+                    ctypes.windll.user32.UnhookWinEvent(hook)
+            except Exception:
+                pass
+
+
+def create_default_event_source():
+    """
+    根据当前平台创建默认的窗口事件源，不支持时返回None
+    """
+    if sys.platform == "win32":
+        return Win32WindowEventSource()
+    return None